@@ -2,19 +2,25 @@
 Flask Web应用入口文件
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from app.models.bookmark import Bookmark
 from app.controllers.bookmark_controller import BookmarkManager
-from app.services.storage_service import Storage
+from app.services.storage_service import Storage, BufferedStorage, IO_BUFFER_SIZE
 from app.services.classifier_service import Classifier
 import os
-import json
+import logging
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from flask_orjson import OrjsonProvider
 from werkzeug.utils import secure_filename
-from bs4 import BeautifulSoup
-from app.utils.script_manager import script_manager
+from lxml import etree
+from app.utils.script_manager import get_script_manager
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = 'uploads'
+app.json = OrjsonProvider(app)
+app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', 'uploads')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
 # 确保上传文件夹存在
@@ -23,56 +29,85 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 # 初始化组件
 manager = BookmarkManager()
 classifier = Classifier()
-storage = Storage('bookmarks.json')
+# 数据文件名以 .gz 结尾时使用gzip压缩存储
+storage = BufferedStorage(Storage(os.environ.get('BOOKMARKS_FILE', 'bookmarks.jsonl'), legacy_path='bookmarks.json'))
 
 # 在启动时加载已有书签
-manager.bookmarks = storage.load_bookmarks()
+manager.set_bookmarks(storage.load_bookmarks())
 
-def parse_and_process_bookmarks(file_path):
-    """解析并处理书签文件"""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+# 后台写入解析结果归档，所有请求共用一个线程
+archive_executor = ThreadPoolExecutor(max_workers=1)
+
+def iter_bookmark_links(f):
+    """流式解析书签HTML，逐个产出(url, title)"""
+    for _, link in etree.iterparse(f, events=('end',), tag='a', html=True, encoding='utf-8'):
+        url = link.get('href')
+        if url is not None:
+            yield url, ''.join(link.itertext()).strip()
         
-        soup = BeautifulSoup(content, 'html.parser')
-        bookmarks = []
+        # 释放已处理的节点，保持内存占用平稳
+        link.clear()
+        while link.getprevious() is not None:
+            del link.getparent()[0]
+
+def parse_and_process_bookmarks(stream):
+    """解析并处理书签文件流"""
+    try:
+        # 创建书签对象
+        bookmarks = [
+            Bookmark(url=url, title=title, tags=[], category=None)
+            for url, title in iter_bookmark_links(stream)
+        ]
         
-        # 查找所有书签链接
-        links = soup.find_all('a', href=True)
+        # 批量自动打标和分类
+        classifier.process_bookmarks(bookmarks)
         
-        for link in links:
-            url = link['href']
-            title = link.get_text(strip=True)
-            
-            # 创建书签对象
-            bookmark = Bookmark(
-                url=url,
-                title=title,
-                tags=[],
-                category=None
-            )
-            
-            # 自动打标和分类
-            classifier.tag_bookmark(bookmark)
-            classifier.classify_bookmark(bookmark)
-            
-            # 添加到管理器
+        for bookmark in bookmarks:
+            # 添加到管理器并追加到存储日志
             manager.add_bookmark(bookmark)
-            bookmarks.append(bookmark)
-        
-        # 保存到文件
-        storage.save_bookmarks(manager.get_bookmarks())
+            storage.append_bookmark(bookmark)
         
         return len(bookmarks)
-    except Exception as e:
-        print(f"Error processing bookmarks file: {e}")
+    except Exception:
+        logger.exception("Error processing bookmarks file")
         return 0
 
+def archive_upload(file, path):
+    """将上传文件从头分块复制到上传目录，不在内存中读取整个文件
+    
+    请求结束后上传流会被关闭，因此在请求线程中复制
+    """
+    try:
+        file.stream.seek(0)
+        file.save(path, buffer_size=IO_BUFFER_SIZE)
+    except Exception:
+        logger.exception(f"Error archiving upload file {path}")
+
+def archive_parsed_data(path, parsed_data):
+    """在后台线程中将解析结果序列化并归档到上传目录"""
+    def write():
+        try:
+            with open(path, 'wb', buffering=IO_BUFFER_SIZE) as f:
+                f.write(orjson.dumps(parsed_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        except Exception:
+            logger.exception(f"Error archiving parsed file {path}")
+    
+    archive_executor.submit(write)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """健康检查接口"""
     return jsonify({'status': 'ok'})
 
+@app.route('/admin/flush', methods=['POST'])
+def flush_bookmarks():
+    """立即将尚未保存的书签修改写入文件"""
+    try:
+        storage.flush()
+    except Exception as e:
+        return jsonify({'error': f'Failed to flush bookmarks: {e}'}), 500
+    return jsonify({'message': 'Bookmarks flushed successfully'}), 200
+
 @app.route('/bookmark', methods=['POST'])
 def add_bookmark():
     """添加单个书签并自动处理"""
@@ -90,23 +125,17 @@ def add_bookmark():
     )
     
     # 自动打标和分类
-    classifier.tag_bookmark(bookmark)
-    classifier.classify_bookmark(bookmark)
+    classifier.process_bookmark(bookmark)
     
     # 添加到管理器
     manager.add_bookmark(bookmark)
     
-    # 保存到文件
-    storage.save_bookmarks(manager.get_bookmarks())
+    # 追加到存储日志
+    storage.append_bookmark(bookmark)
     
     return jsonify({
         'message': 'Bookmark processed successfully',
-        'bookmark': {
-            'url': bookmark.url,
-            'title': bookmark.title,
-            'tags': bookmark.tags,
-            'category': bookmark.category
-        }
+        'bookmark': bookmark
     }), 201
 
 @app.route('/bookmarks/batch', methods=['POST'])
@@ -117,100 +146,72 @@ def add_bookmarks_batch():
     if not data or 'bookmarks' not in data:
         return jsonify({'error': 'Bookmarks array is required'}), 400
     
-    processed_bookmarks = []
-    
+    # 创建书签对象，URL和标题都已存在的书签不再重复处理
+    bookmarks = []
+    new_bookmarks = []
     for item in data['bookmarks']:
-        # 创建书签对象
+        title = item.get('title', '')
+        existing = manager.get_bookmark(item['url'])
+        if existing is not None and existing.title == title:
+            # 请求中的标签或分类与现有书签不同时，与PUT一样更新书签属性
+            changed = False
+            if 'tags' in item and item['tags'] != existing.tags:
+                existing.tags = item['tags']
+                changed = True
+            if 'category' in item and item['category'] != existing.category:
+                existing.category = item['category']
+                changed = True
+            if changed:
+                manager.update_bookmark(existing)
+                storage.append_bookmark(existing)
+            bookmarks.append(existing)
+            continue
+        
         bookmark = Bookmark(
             url=item['url'],
-            title=item.get('title', ''),
+            title=title,
             tags=item.get('tags', []),
             category=item.get('category')
         )
-        
-        # 自动打标和分类
-        classifier.tag_bookmark(bookmark)
-        classifier.classify_bookmark(bookmark)
-        
+        bookmarks.append(bookmark)
+        new_bookmarks.append(bookmark)
+    
+    # 批量自动打标和分类
+    classifier.process_bookmarks(new_bookmarks)
+    
+    for bookmark in new_bookmarks:
         # 添加到管理器
         manager.add_bookmark(bookmark)
-        
-        # 添加到结果列表
-        processed_bookmarks.append({
-            'url': bookmark.url,
-            'title': bookmark.title,
-            'tags': bookmark.tags,
-            'category': bookmark.category
-        })
-    
-    # 保存到文件
-    storage.save_bookmarks(manager.get_bookmarks())
+        storage.append_bookmark(bookmark)
     
     return jsonify({
-        'message': f'Successfully processed {len(processed_bookmarks)} bookmarks',
-        'bookmarks': processed_bookmarks
+        'message': f'Successfully processed {len(bookmarks)} bookmarks',
+        'bookmarks': bookmarks
     }), 201
 
 @app.route('/bookmarks', methods=['GET'])
 def get_bookmarks():
     """获取所有书签"""
-    bookmarks = manager.get_bookmarks()
-    result = []
-    
-    for bookmark in bookmarks:
-        result.append({
-            'url': bookmark.url,
-            'title': bookmark.title,
-            'tags': bookmark.tags,
-            'category': bookmark.category
-        })
-        
-    return jsonify({'bookmarks': result})
+    return Response(manager.get_bookmarks_json(), mimetype='application/json')
 
 @app.route('/bookmarks/category/<category>', methods=['GET'])
 def get_bookmarks_by_category(category):
     """根据分类获取书签"""
     bookmarks = manager.get_bookmarks_by_category(category)
-    result = []
-    
-    for bookmark in bookmarks:
-        result.append({
-            'url': bookmark.url,
-            'title': bookmark.title,
-            'tags': bookmark.tags,
-            'category': bookmark.category
-        })
-        
-    return jsonify({'bookmarks': result})
+    return jsonify({'bookmarks': bookmarks})
 
 @app.route('/bookmarks/tag/<tag>', methods=['GET'])
 def get_bookmarks_by_tag(tag):
     """根据标签获取书签"""
     bookmarks = manager.get_bookmarks_by_tag(tag)
-    result = []
-    
-    for bookmark in bookmarks:
-        result.append({
-            'url': bookmark.url,
-            'title': bookmark.title,
-            'tags': bookmark.tags,
-            'category': bookmark.category
-        })
-        
-    return jsonify({'bookmarks': result})
+    return jsonify({'bookmarks': bookmarks})
 
 @app.route('/bookmark/<path:url>', methods=['DELETE'])
 def delete_bookmark(url):
     """根据URL删除书签"""
-    original_count = len(manager.get_bookmarks())
-    manager.remove_bookmark(url)
-    
-    # 保存到文件
-    storage.save_bookmarks(manager.get_bookmarks())
-    
-    new_count = len(manager.get_bookmarks())
-    
-    if new_count < original_count:
+    if manager.remove_bookmark(url) is not None:
+        # 追加删除记录到存储日志
+        storage.delete_bookmark(url)
         return jsonify({'message': 'Bookmark deleted successfully'}), 200
     else:
         return jsonify({'message': 'Bookmark not found'}), 404
@@ -224,12 +225,7 @@ def update_bookmark(url):
         return jsonify({'error': 'Request body is required'}), 400
     
     # 查找现有书签
-    bookmarks = manager.get_bookmarks()
-    bookmark = None
-    for b in bookmarks:
-        if b.url == url:
-            bookmark = b
-            break
+    bookmark = manager.get_bookmark(url)
     
     if not bookmark:
         return jsonify({'error': 'Bookmark not found'}), 404
@@ -244,20 +240,15 @@ def update_bookmark(url):
     
     # 如果需要重新处理分类和标签
     if data.get('reprocess', False):
-        classifier.tag_bookmark(bookmark)
-        classifier.classify_bookmark(bookmark)
+        classifier.process_bookmark(bookmark)
     
-    # 保存到文件
-    storage.save_bookmarks(manager.get_bookmarks())
+    # 保存修改并追加到存储日志
+    manager.update_bookmark(bookmark)
+    storage.append_bookmark(bookmark)
     
     return jsonify({
         'message': 'Bookmark updated successfully',
-        'bookmark': {
-            'url': bookmark.url,
-            'title': bookmark.title,
-            'tags': bookmark.tags,
-            'category': bookmark.category
-        }
+        'bookmark': bookmark
     }), 200
 
 @app.route('/bookmark/upload', methods=['POST'])
@@ -277,13 +268,14 @@ def upload_bookmark_file():
     if not file.filename.endswith('.html'):
         return jsonify({'error': 'Invalid file type. Only HTML files are allowed.'}), 400
     
-    # 保存文件
     filename = secure_filename(file.filename)
     file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(file_path)
     
-    # 解析并处理书签文件
-    processed_count = parse_and_process_bookmarks(file_path)
+    # 直接从上传流解析并处理书签文件，不先落盘
+    processed_count = parse_and_process_bookmarks(file.stream)
+    
+    # 归档上传文件
+    archive_upload(file, file_path)
     
     return jsonify({
         'message': f'File uploaded and processed successfully. {processed_count} bookmarks added.',
@@ -299,7 +291,7 @@ def upload_bookmark_file():
 @app.route('/scripts', methods=['GET'])
 def get_scripts():
     """获取已注册的脚本列表"""
-    result = script_manager.list_scripts()
+    result = get_script_manager().list_scripts()
     if result['status'] == 'success':
         return jsonify(result['data']), 200
     else:
@@ -322,33 +314,30 @@ def parse_bookmarks():
     if not file.filename.endswith('.html'):
         return jsonify({'error': 'Invalid file type. Only HTML files are allowed.'}), 400
     
-    # 保存文件
     filename = secure_filename(file.filename)
     file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(file_path)
     
     # 生成输出文件名
     output_filename = f"parsed_{filename.replace('.html', '.json')}"
     output_path = os.path.join(app.config['UPLOAD_FOLDER'], output_filename)
     
-    # 运行解析器脚本
-    result = script_manager.run_script('parser', [file_path, output_path])
+    # 直接从上传流运行解析器脚本，不先落盘
+    result = get_script_manager().process_data('parser', file.stream)
     
     if result['status'] == 'success':
-        # 读取解析结果
-        try:
-            with open(output_path, 'r', encoding='utf-8') as f:
-                parsed_data = json.load(f)
-            
-            return jsonify({
-                'message': 'Bookmarks parsed successfully',
-                'filename': filename,
-                'output_filename': output_filename,
-                'parsed_count': result['data']['bookmark_count'],
-                'parsed_data': parsed_data
-            }), 201
-        except Exception as e:
-            return jsonify({'error': f'Failed to read parsed data: {str(e)}'}), 500
+        parsed_data = result['data']['bookmarks']
+        
+        # 归档上传文件，解析结果在后台写入
+        archive_upload(file, file_path)
+        archive_parsed_data(output_path, parsed_data)
+        
+        return jsonify({
+            'message': 'Bookmarks parsed successfully',
+            'filename': filename,
+            'output_filename': output_filename,
+            'parsed_count': result['data']['bookmark_count'],
+            'parsed_data': parsed_data
+        }), 201
     else:
         return jsonify({'error': result['message']}), 500
 
@@ -360,41 +349,16 @@ def analyze_bookmarks():
     if not data or 'bookmarks' not in data:
         return jsonify({'error': 'Bookmarks data is required'}), 400
     
-    # 保存临时文件
-    temp_input = os.path.join(app.config['UPLOAD_FOLDER'], 'temp_bookmarks.json')
-    with open(temp_input, 'w', encoding='utf-8') as f:
-        json.dump(data['bookmarks'], f, ensure_ascii=False, indent=2)
-    
-    # 生成输出文件名
-    temp_output = os.path.join(app.config['UPLOAD_FOLDER'], 'temp_suggestions.json')
-    
-    # 运行分析器脚本
-    result = script_manager.run_script('analyzer', [temp_input, temp_output])
+    # 书签数据直接在内存中交给分析器，不写临时文件
+    result = get_script_manager().process_data('analyzer', data['bookmarks'])
     
     if result['status'] == 'success':
-        # 读取分析结果
-        try:
-            with open(temp_output, 'r', encoding='utf-8') as f:
-                suggestions = json.load(f)
-            
-            # 删除临时文件
-            os.remove(temp_input)
-            os.remove(temp_output)
-            
-            return jsonify({
-                'message': 'Bookmarks analyzed successfully',
-                'suggestion_count': result['data']['suggestion_count'],
-                'suggestions': suggestions
-            }), 200
-        except Exception as e:
-            return jsonify({'error': f'Failed to read analysis results: {str(e)}'}), 500
+        return jsonify({
+            'message': 'Bookmarks analyzed successfully',
+            'suggestion_count': result['data']['suggestion_count'],
+            'suggestions': result['data']['suggestions']
+        }), 200
     else:
-        # 删除临时文件
-        if os.path.exists(temp_input):
-            os.remove(temp_input)
-        if os.path.exists(temp_output):
-            os.remove(temp_output)
-        
         return jsonify({'error': result['message']}), 500
 
 @app.route('/scripts/process', methods=['POST'])
@@ -414,55 +378,31 @@ def process_bookmarks():
     if not file.filename.endswith('.html'):
         return jsonify({'error': 'Invalid file type. Only HTML files are allowed.'}), 400
     
-    # 保存文件
     filename = secure_filename(file.filename)
     file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(file_path)
     
-    # 生成中间文件名
-    parsed_filename = f"parsed_{filename.replace('.html', '.json')}"
-    parsed_path = os.path.join(app.config['UPLOAD_FOLDER'], parsed_filename)
-    suggestions_filename = f"suggestions_{filename.replace('.html', '.json')}"
-    suggestions_path = os.path.join(app.config['UPLOAD_FOLDER'], suggestions_filename)
-    
-    # 运行解析器脚本
-    parse_result = script_manager.run_script('parser', [file_path, parsed_path])
+    # 直接从上传流运行解析器脚本，解析结果在内存中交给分析器，不写中间文件
+    parse_result = get_script_manager().process_data('parser', file.stream)
     
     if parse_result['status'] != 'success':
         return jsonify({'error': f'Parsing failed: {parse_result["message"]}'}), 500
     
+    # 归档上传文件
+    archive_upload(file, file_path)
+    
     # 运行分析器脚本
-    analyze_result = script_manager.run_script('analyzer', [parsed_path, suggestions_path])
+    analyze_result = get_script_manager().process_data('analyzer', parse_result['data']['bookmarks'])
     
     if analyze_result['status'] != 'success':
-        # 删除解析结果文件
-        if os.path.exists(parsed_path):
-            os.remove(parsed_path)
         return jsonify({'error': f'Analysis failed: {analyze_result["message"]}'}), 500
     
-    # 读取最终结果
-    try:
-        with open(suggestions_path, 'r', encoding='utf-8') as f:
-            suggestions = json.load(f)
-        
-        # 删除临时文件
-        os.remove(parsed_path)
-        os.remove(suggestions_path)
-        
-        return jsonify({
-            'message': 'Bookmarks processed successfully',
-            'filename': filename,
-            'parsed_count': parse_result['data']['bookmark_count'],
-            'suggestion_count': analyze_result['data']['suggestion_count'],
-            'suggestions': suggestions
-        }), 201
-    except Exception as e:
-        # 清理临时文件
-        if os.path.exists(parsed_path):
-            os.remove(parsed_path)
-        if os.path.exists(suggestions_path):
-            os.remove(suggestions_path)
-        return jsonify({'error': f'Failed to read final results: {str(e)}'}), 500
+    return jsonify({
+        'message': 'Bookmarks processed successfully',
+        'filename': filename,
+        'parsed_count': parse_result['data']['bookmark_count'],
+        'suggestion_count': analyze_result['data']['suggestion_count'],
+        'suggestions': analyze_result['data']['suggestions']
+    }), 201
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=9001)
\ No newline at end of file
@@ -2,28 +2,99 @@
 书签管理器核心逻辑
 """
 
+import orjson
+from collections import defaultdict
 from app.models.bookmark import Bookmark
 
 class BookmarkManager:
     def __init__(self):
-        self.bookmarks = []
+        # 以URL为键的书签索引，保持插入顺序
+        self._by_url = {}
+        # 分类和标签的倒排索引：键 -> {URL: 书签}
+        self._by_category = defaultdict(dict)
+        self._by_tag = defaultdict(dict)
+        # 每个书签建立索引时使用的(分类, 标签)，书签被原地修改后据此移除旧索引
+        self._index_keys = {}
+        # 全部书签序列化后的JSON缓存，书签变更时失效
+        self._cached_json_bytes = None
+        
+    def set_bookmarks(self, bookmarks):
+        """替换全部书签"""
+        self._by_url = {b.url: b for b in bookmarks}
+        self._by_category = defaultdict(dict)
+        self._by_tag = defaultdict(dict)
+        self._index_keys = {}
+        for bookmark in self._by_url.values():
+            self._index(bookmark)
+        self._cached_json_bytes = None
         
     def add_bookmark(self, bookmark):
-        """添加书签"""
-        self.bookmarks.append(bookmark)
+        """添加书签，URL已存在时替换原书签"""
+        self._unindex(bookmark.url)
+        self._by_url[bookmark.url] = bookmark
+        self._index(bookmark)
+        self._cached_json_bytes = None
+        
+    def update_bookmark(self, bookmark):
+        """书签属性被修改后调用，保存修改后的书签并更新索引"""
+        self._unindex(bookmark.url)
+        self._by_url[bookmark.url] = bookmark
+        self._index(bookmark)
+        self._cached_json_bytes = None
         
     def remove_bookmark(self, url):
-        """根据URL删除书签"""
-        self.bookmarks = [b for b in self.bookmarks if b.url != url]
+        """根据URL删除书签，返回被删除的书签，不存在时返回None"""
+        bookmark = self._by_url.pop(url, None)
+        if bookmark is not None:
+            self._unindex(url)
+            self._cached_json_bytes = None
+        return bookmark
+        
+    def get_bookmark(self, url):
+        """根据URL获取书签，不存在时返回None"""
+        return self._by_url.get(url)
         
     def get_bookmarks(self):
         """获取所有书签"""
-        return self.bookmarks
+        return list(self._by_url.values())
+        
+    def get_bookmarks_json(self):
+        """获取所有书签序列化后的JSON字节串，未变更时复用缓存"""
+        if self._cached_json_bytes is None:
+            self._cached_json_bytes = orjson.dumps({'bookmarks': list(self._by_url.values())})
+        return self._cached_json_bytes
         
     def get_bookmarks_by_category(self, category):
         """根据分类获取书签"""
-        return [b for b in self.bookmarks if b.category == category]
+        return list(self._by_category.get(category, {}).values())
         
     def get_bookmarks_by_tag(self, tag):
         """根据标签获取书签"""
-        return [b for b in self.bookmarks if tag in b.tags]
\ No newline at end of file
+        return list(self._by_tag.get(tag, {}).values())
+        
+    def _index(self, bookmark):
+        """将书签加入分类和标签索引"""
+        tags = tuple(bookmark.tags)
+        self._by_category[bookmark.category][bookmark.url] = bookmark
+        for tag in tags:
+            self._by_tag[tag][bookmark.url] = bookmark
+        self._index_keys[bookmark.url] = (bookmark.category, tags)
+        
+    def _unindex(self, url):
+        """将书签从分类和标签索引中移除"""
+        keys = self._index_keys.pop(url, None)
+        if keys is None:
+            return
+        category, tags = keys
+        self._discard(self._by_category, category, url)
+        for tag in tags:
+            self._discard(self._by_tag, tag, url)
+            
+    def _discard(self, index, key, url):
+        """从索引中移除一条书签，键下没有书签时删除该键"""
+        entries = index.get(key)
+        if entries is None:
+            return
+        entries.pop(url, None)
+        if not entries:
+            del index[key]
\ No newline at end of file
@@ -2,12 +2,18 @@
 书签数据结构定义
 """
 
+from dataclasses import dataclass, field
+
+@dataclass(eq=False, repr=False)
 class Bookmark:
-    def __init__(self, url, title, tags=None, category=None):
-        self.url = url
-        self.title = title
-        self.tags = tags or []
-        self.category = category
+    # 字段顺序即序列化输出顺序，orjson可直接序列化，无需转换为字典
+    url: str
+    title: str
+    tags: list = field(default_factory=list)
+    category: str = None
+    
+    def __post_init__(self):
+        self.tags = self.tags or []
         
     def __str__(self):
         return f"Bookmark(url='{self.url}', title='{self.title}', tags={self.tags}, category='{self.category}')"
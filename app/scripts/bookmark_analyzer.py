@@ -11,86 +11,82 @@
 5. 输出格式：支持JSON、CSV和格式化文本输出
 
 使用方法：
-python bookmark_analyzer.py <input_file> [output_file] [output_format]
+python bookmark_analyzer.py <input_file> [output_file] [output_format] [--format FORMAT] [--no-ai] [--no-hybrid]
 
 参数：
   input_file: 输入的书签JSON文件路径
   output_file: 输出文件路径（可选，默认：bookmark_suggestions.json）
   output_format: 输出格式（可选，支持：json, csv, text，默认：json）
+  --format: 输出格式，与output_format相同
+  --no-ai: 不使用AI分类
+  --no-hybrid: 不使用混合分类，仅使用AI分类结果
 
 依赖：
 - 无外部依赖，使用Python标准库
+- 可选：pyahocorasick，安装后使用Aho-Corasick自动机匹配关键词
+- 可选：orjson，安装后使用orjson读写JSON
 """
 
 import os
 import sys
 import json
+import argparse
 import csv
 import logging
+import multiprocessing
 import random
+import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 from abc import ABC, abstractmethod
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - [analyzer] %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from app.scripts.interface import ScriptInterface
+except ImportError:
+    # 直接运行脚本时，脚本所在目录位于sys.path中
+    from interface import ScriptInterface
+
 logger = logging.getLogger('analyzer')
 
+# 支持的输出格式
+_OUTPUT_FORMATS = ('json', 'csv', 'text')
+
 
-class ScriptInterface:
+class _ArgumentParser(argparse.ArgumentParser):
     """
-    脚本接口基类，定义标准化接口
+    参数错误时抛出ValueError而不是退出进程，脚本也会在应用进程内执行
     """
     
-    def __init__(self):
-        self.name = ""
-        self.description = ""
-        self.version = "1.0.0"
-        self.author = ""
-    
-    def configure(self, config: Dict[str, Any]) -> bool:
-        """
-        配置脚本
-        
-        Args:
-            config: 配置参数
-        
-        Returns:
-            bool: 配置是否成功
-        """
-        return True
-    
-    def execute(self, args: List[str]) -> Dict[str, Any]:
-        """
-        执行脚本
-        
-        Args:
-            args: 命令行参数
-        
-        Returns:
-            Dict: 执行结果，包含status和data字段
-        """
-        return {"status": "success", "data": {}}
-    
-    def get_info(self) -> Dict[str, Any]:
-        """
-        获取脚本信息
-        
-        Returns:
-            Dict: 脚本信息
-        """
-        return {
-            "name": self.name,
-            "description": self.description,
-            "version": self.version,
-            "author": self.author
-        }
+    def error(self, message):
+        raise ValueError(message)
+
+
+# 命令行参数解析器，模块加载时创建一次
+_ARG_PARSER = _ArgumentParser(prog='bookmark_analyzer.py', add_help=False)
+_ARG_PARSER.add_argument('input_file')
+_ARG_PARSER.add_argument('output_file', nargs='?')
+_ARG_PARSER.add_argument('output_format', nargs='?')
+_ARG_PARSER.add_argument('--format', choices=_OUTPUT_FORMATS)
+_ARG_PARSER.add_argument('--no-ai', action='store_true')
+_ARG_PARSER.add_argument('--no-hybrid', action='store_true')
+
+# 标题清理使用的正则表达式
+_RE_BRACKETS = re.compile(r'\[.*?\]|\(.*?\)|\{.*?\}|【.*?】|（.*?）')
+_RE_PUNCT = re.compile(r'[_+@#!?,;:*/|]')
+_RE_WS = re.compile(r'\s+')
+_RE_NONWORD = re.compile(r'[^\w\u4e00-\u9fa5]')
 
 
 class AIClassifier(ABC):
@@ -98,14 +94,21 @@ class AIClassifier(ABC):
     AI分类器抽象基类，定义AI分类接口
     """
     
+    # 分类器依赖的关键词，分析器会在同一次扫描中预先查找这些关键词
+    keywords = frozenset()
+    
     @abstractmethod
-    def classify(self, text: str, url: str) -> List[str]:
+    def classify(self, text: str, url: str, text_lower: Optional[str] = None,
+                 url_lower: Optional[str] = None, keyword_hits: Optional[tuple] = None) -> List[str]:
         """
         分类方法，返回类别列表
         
         Args:
             text: 文本内容
             url: URL地址
+            text_lower: 已转为小写的文本内容（可选）
+            url_lower: 已转为小写的URL地址（可选）
+            keyword_hits: 文本和URL中出现的keywords关键词集合(文本命中, URL命中)（可选）
         
         Returns:
             类别列表
@@ -128,59 +131,74 @@ class MockAIClassifier(AIClassifier):
             available_categories: 可用的类别列表
         """
         self.available_categories = available_categories
+        
+        # 模拟的关键词分类规则：(类别, 在文本中匹配的关键词, 在URL中匹配的关键词)
+        # 这里可以替换为真实的AI API调用
+        self.keyword_rules = [
+            ('AI工具', ['ai', '人工智能', 'chatgpt', 'gpt'], ['ai', '人工智能', 'chatgpt', 'gpt']),
+            ('前端开发', ['react', 'vue', 'js', 'javascript', 'typescript'],
+             ['react', 'vue', 'js', 'javascript', 'typescript']),
+            ('开源项目', ['开源'], ['github']),
+            ('UI设计', ['ui', '设计', '图标', '组件'], ['ui', '设计', '图标', '组件']),
+            ('技术博客', ['blog', '教程', '文章'], ['blog', '教程', '文章']),
+            ('文档', ['文档'], ['docs']),
+            ('命令工具', ['命令', 'cli', 'terminal', 'git'], ['命令', 'cli', 'terminal', 'git']),
+            ('NAS', ['nas', '群晖'], [])
+        ]
+        self.keywords = frozenset(
+            keyword
+            for _, text_keywords, url_keywords in self.keyword_rules
+            for keyword in text_keywords + url_keywords
+        )
+        
+        # 预先生成随机类别下标序列，分类时依次取用，避免每次调用随机数生成器
+        # 下标等于类别数时表示不添加额外类别
+        rng = random.Random(0)
+        self._random_picks = [rng.randint(0, len(available_categories)) for _ in range(4096)]
+        self._pick_pos = 0
     
-    def classify(self, text: str, url: str) -> List[str]:
+    def classify(self, text: str, url: str, text_lower: Optional[str] = None,
+                 url_lower: Optional[str] = None, keyword_hits: Optional[tuple] = None) -> List[str]:
         """
         模拟AI分类
         
         Args:
             text: 文本内容
             url: URL地址
+            text_lower: 已转为小写的文本内容（可选）
+            url_lower: 已转为小写的URL地址（可选）
+            keyword_hits: 文本和URL中出现的keywords关键词集合(文本命中, URL命中)（可选）
         
         Returns:
             类别列表
         """
-        categories = []
-        
-        # 模拟基于关键词的AI分类逻辑
-        # 这里可以替换为真实的AI API调用
-        
-        # 检查文本中的关键词
-        text_lower = text.lower()
-        url_lower = url.lower()
+        # 分析器未预先扫描关键词时自行查找
+        if keyword_hits is None:
+            if text_lower is None:
+                text_lower = text.lower()
+            if url_lower is None:
+                url_lower = url.lower()
+            keyword_hits = (
+                {keyword for keyword in self.keywords if keyword in text_lower},
+                {keyword for keyword in self.keywords if keyword in url_lower}
+            )
+        text_hits, url_hits = keyword_hits
         
         # 基于文本特征的分类
-        if any(keyword in text_lower or keyword in url_lower for keyword in ['ai', '人工智能', 'chatgpt', 'gpt']):
-            categories.append('AI工具')
-        
-        if any(keyword in text_lower or keyword in url_lower for keyword in ['react', 'vue', 'js', 'javascript', 'typescript']):
-            categories.append('前端开发')
-        
-        if 'github' in url_lower or '开源' in text_lower:
-            categories.append('开源项目')
-        
-        if any(keyword in text_lower or keyword in url_lower for keyword in ['ui', '设计', '图标', '组件']):
-            categories.append('UI设计')
+        categories = [
+            category
+            for category, text_keywords, url_keywords in self.keyword_rules
+            if not text_hits.isdisjoint(text_keywords) or not url_hits.isdisjoint(url_keywords)
+        ]
         
-        if any(keyword in text_lower or keyword in url_lower for keyword in ['blog', '教程', '文章']):
-            categories.append('技术博客')
-        
-        if 'docs' in url_lower or '文档' in text_lower:
-            categories.append('文档')
-        
-        if any(keyword in text_lower or keyword in url_lower for keyword in ['命令', 'cli', 'terminal', 'git']):
-            categories.append('命令工具')
-        
-        if 'nas' in text_lower or '群晖' in text_lower:
-            categories.append('NAS')
-        
-        # 模拟AI模型的置信度评分，随机选择1-2个额外类别
+        # 模拟AI模型的置信度评分，随机选择0-1个额外类别，模拟AI的不确定性
         if len(categories) < 3:
-            remaining_categories = [cat for cat in self.available_categories if cat not in categories]
-            if remaining_categories:
-                # 随机选择0-1个额外类别，模拟AI的不确定性
-                extra_categories = random.sample(remaining_categories, k=random.randint(0, 1))
-                categories.extend(extra_categories)
+            pick = self._random_picks[self._pick_pos]
+            self._pick_pos = (self._pick_pos + 1) % len(self._random_picks)
+            if pick < len(self.available_categories):
+                extra_category = self.available_categories[pick]
+                if extra_category not in categories:
+                    categories.append(extra_category)
         
         return categories[:3]  # 限制最多3个类别
 
@@ -203,7 +221,9 @@ class BookmarkAnalyzer(ScriptInterface):
             'ai_confidence_threshold': 0.7,  # AI分类置信度阈值
             'hybrid_classification': True,  # 是否使用混合分类（AI + 规则）
             'max_suggestions': 3,  # 每个类型的最大建议数量
-            'output_format': 'json'  # 默认输出格式
+            'output_format': 'json',  # 默认输出格式
+            'parallel_threshold': 100000,  # 命令行分析的书签数量达到此值时使用多进程分析
+            'max_workers': None  # 多进程分析的进程数，None表示CPU核心数
         }
         
         # 预定义的分类关键词映射
@@ -237,10 +257,40 @@ class BookmarkAnalyzer(ScriptInterface):
             'NAS': ['NAS', '存储'],
             '命令工具': ['命令工具', '终端工具', 'Git工具']
         }
+        # 每个类别的分组建议预先去重并转换为元组
+        self.group_suggestions = {
+            category: tuple(dict.fromkeys(groups)) for category, groups in self.group_suggestions.items()
+        }
         
         # 初始化AI分类器
         self.available_categories = list(self.category_keywords.keys())
         self.ai_classifier = MockAIClassifier(self.available_categories)
+        
+        # 分类关键词和AI分类器关键词共用一个自动机，未安装pyahocorasick时为None
+        self._keywords = frozenset(
+            keyword for keywords in self.category_keywords.values() for keyword in keywords
+        ) | self.ai_classifier.keywords
+        self._keyword_automaton = self._build_keyword_automaton()
+        
+        # 按(标题, URL)缓存别名和分类建议，重复书签无需重新计算
+        self._init_caches()
+    
+    def _init_caches(self):
+        """创建别名和分类建议的结果缓存"""
+        self._alias_cached = lru_cache(maxsize=100000)(self._alias_core)
+        self._category_cached = lru_cache(maxsize=100000)(self._category_core)
+    
+    def __getstate__(self):
+        """序列化到子进程时不携带结果缓存"""
+        state = self.__dict__.copy()
+        del state['_alias_cached']
+        del state['_category_cached']
+        return state
+    
+    def __setstate__(self, state):
+        """反序列化后重新创建结果缓存"""
+        self.__dict__.update(state)
+        self._init_caches()
     
     def configure(self, config: Dict[str, Any]) -> bool:
         """
@@ -254,6 +304,9 @@ class BookmarkAnalyzer(ScriptInterface):
         """
         try:
             self.config.update(config)
+            # 分类结果依赖配置，配置变更后清空缓存
+            self._alias_cached.cache_clear()
+            self._category_cached.cache_clear()
             logger.info(f"配置更新: {list(config.keys())}")
             return True
         except Exception as e:
@@ -279,38 +332,42 @@ class BookmarkAnalyzer(ScriptInterface):
                     "usage": "python bookmark_analyzer.py <input_file> [output_file] [output_format]"
                 }
             
-            # 解析位置参数
-            input_file = args[0]
+            try:
+                parsed = _ARG_PARSER.parse_intermixed_args(args)
+            except ValueError as e:
+                return {
+                    "status": "error",
+                    "message": f"参数错误: {str(e)}",
+                    "usage": _ARG_PARSER.format_usage().strip()
+                }
+            
+            input_file = parsed.input_file
+            output_file = parsed.output_file
+            output_format = (parsed.format or parsed.output_format or self.config['output_format']).lower()
             
-            # 解析可选参数
-            output_file = 'bookmark_suggestions.json'
-            output_format = self.config['output_format']
+            # 兼容 <input_file> <output_format> 的旧用法
+            if output_file is not None and parsed.output_format is None and output_file.lower() in _OUTPUT_FORMATS:
+                if parsed.format is None:
+                    output_format = output_file.lower()
+                output_file = None
+            if output_file is None:
+                output_file = 'bookmark_suggestions.json'
             
-            # 处理命令行参数
-            for i in range(1, len(args)):
-                arg = args[i]
-                if arg.startswith('--'):
-                    # 处理标志参数
-                    if arg == '--no-ai':
-                        self.config['use_ai_classification'] = False
-                    elif arg == '--no-hybrid':
-                        self.config['hybrid_classification'] = False
-                elif '.' in arg:
-                    # 处理文件路径参数
-                    if arg.lower().endswith('.json') or arg.lower().endswith('.csv') or arg.lower().endswith('.txt'):
-                        output_file = arg
-                    else:
-                        output_format = arg.lower()
-                else:
-                    # 处理输出格式参数
-                    output_format = arg.lower()
+            # 处理标志参数，通过configure更新配置，配置变化时清空分类结果缓存
+            flags = {}
+            if parsed.no_ai and self.config['use_ai_classification']:
+                flags['use_ai_classification'] = False
+            if parsed.no_hybrid and self.config['hybrid_classification']:
+                flags['hybrid_classification'] = False
+            if flags:
+                self.configure(flags)
             
             # 验证输出格式
-            if output_format not in ['json', 'csv', 'text']:
+            if output_format not in _OUTPUT_FORMATS:
                 return {
                     "status": "error",
                     "message": f"不支持的输出格式: {output_format}",
-                    "data": {"supported_formats": ['json', 'csv', 'text']}
+                    "data": {"supported_formats": list(_OUTPUT_FORMATS)}
                 }
             
             # 更新配置
@@ -328,21 +385,22 @@ class BookmarkAnalyzer(ScriptInterface):
                 }
             
             # 分析书签
-            results = self.analyze_bookmarks(bookmarks)
+            results = self.iter_analysis(bookmarks, include_date=(output_format == 'json'), parallel=True)
             
-            # 写入输出
+            # 写入输出，结果边生成边写入
+            suggestion_count = 0
             if output_format == 'json':
-                self.write_json_output(results, output_file)
+                suggestion_count = self.write_json_output(results, output_file)
             elif output_format == 'csv':
                 # 确保输出文件以.csv结尾
                 if not output_file.lower().endswith('.csv'):
                     output_file = output_file + '.csv'
-                self.write_csv_output(results, output_file)
+                suggestion_count = self.write_csv_output(results, output_file)
             elif output_format == 'text':
                 # 确保输出文件以.txt结尾
                 if not output_file.lower().endswith('.txt'):
                     output_file = output_file + '.txt'
-                self.write_text_output(results, output_file)
+                suggestion_count = self.write_text_output(results, output_file)
             
             logger.info("书签分析完成！")
             
@@ -354,7 +412,7 @@ class BookmarkAnalyzer(ScriptInterface):
                     "output_file": output_file,
                     "output_format": output_format,
                     "bookmark_count": len(bookmarks),
-                    "suggestion_count": len(results),
+                    "suggestion_count": suggestion_count,
                     "output_path": os.path.abspath(output_file)
                 }
             }
@@ -381,6 +439,42 @@ class BookmarkAnalyzer(ScriptInterface):
                 "message": error_msg
             }
     
+    def process(self, data: Any) -> Dict[str, Any]:
+        """
+        在内存中分析书签，不读写文件
+        
+        Args:
+            data: 书签数据列表
+        
+        Returns:
+            Dict: 执行结果，data字段包含带建议的书签列表
+        """
+        try:
+            if not data:
+                return {
+                    "status": "error",
+                    "message": "未加载到书签数据"
+                }
+            
+            results = self.analyze_bookmarks(data)
+            
+            return {
+                "status": "success",
+                "message": "书签分析成功",
+                "data": {
+                    "bookmark_count": len(data),
+                    "suggestion_count": len(results),
+                    "suggestions": results
+                }
+            }
+        except Exception as e:
+            error_msg = f"程序执行失败: {str(e)}"
+            logger.error(error_msg)
+            return {
+                "status": "error",
+                "message": error_msg
+            }
+    
     def load_bookmarks(self, file_path: str) -> List[Dict[str, Any]]:
         """
         加载书签JSON文件
@@ -392,8 +486,13 @@ class BookmarkAnalyzer(ScriptInterface):
             书签数据列表
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                bookmarks = json.load(f)
+            if orjson is not None:
+                # orjson直接解析UTF-8字节，无需先解码为字符串
+                with open(file_path, 'rb') as f:
+                    bookmarks = orjson.loads(f.read())
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    bookmarks = json.load(f)
             logger.info(f"成功加载 {len(bookmarks)} 个书签")
             return bookmarks
         except FileNotFoundError:
@@ -416,8 +515,19 @@ class BookmarkAnalyzer(ScriptInterface):
         Returns:
             别名建议列表
         """
-        title = bookmark.get('title', '')
-        url = bookmark.get('url', '')
+        return list(self._alias_cached(bookmark.get('title', ''), bookmark.get('url', '')))
+    
+    def _alias_core(self, title: str, url: str) -> tuple:
+        """
+        根据标题和URL生成别名建议
+        
+        Args:
+            title: 书签标题
+            url: 书签URL
+        
+        Returns:
+            别名建议元组
+        """
         alias_suggestions = []
         
         # 方法1：使用标题的简洁版本
@@ -441,8 +551,8 @@ class BookmarkAnalyzer(ScriptInterface):
             default_alias = f"{clean_title or '书签'}_{len(alias_suggestions) + 1}"
             alias_suggestions.append(default_alias)
         
-        # 限制最多3个别名
-        return alias_suggestions[:3]
+        # 限制最多max_suggestions个别名
+        return tuple(alias_suggestions[:self.config['max_suggestions']])
     
     def _clean_title(self, title: str) -> str:
         """
@@ -455,11 +565,10 @@ class BookmarkAnalyzer(ScriptInterface):
             简洁标题
         """
         # 移除括号及内容
-        import re
-        clean = re.sub(r'\[.*?\]|\(.*?\)|\{.*?\}|【.*?】|（.*?）', '', title)
+        clean = _RE_BRACKETS.sub('', title)
         # 移除特殊符号和多余空格
-        clean = re.sub(r'[|_|+|@|#|!|?|,|;|:|\*|/]', ' ', clean)
-        clean = re.sub(r'\s+', ' ', clean).strip()
+        clean = _RE_PUNCT.sub(' ', clean)
+        clean = _RE_WS.sub(' ', clean).strip()
         # 限制长度
         if len(clean) > 20:
             clean = clean[:20] + '...'
@@ -475,29 +584,47 @@ class BookmarkAnalyzer(ScriptInterface):
         Returns:
             域名关键词
         """
-        from urllib.parse import urlparse
-        try:
-            parsed = urlparse(url)
-            # 获取域名
-            domain = parsed.netloc
-            # 移除www.和.com等后缀
-            domain_parts = domain.split('.')
-            if len(domain_parts) >= 2:
-                # 提取核心域名
-                if domain_parts[0] == 'www':
-                    keyword = domain_parts[1]
-                else:
-                    keyword = domain_parts[0]
-                # 处理特殊情况
-                if keyword == 'github':
-                    # 从路径中提取项目名
-                    path_parts = parsed.path.strip('/').split('/')
-                    if len(path_parts) >= 2:
-                        keyword = f"{path_parts[0]}_{path_parts[1]}"
-                return keyword
-            return ''
-        except Exception:
+        # 直接扫描字符串拆出主机和路径，不构造完整的urlparse结果
+        start = url.find('://')
+        if start >= 0:
+            rest = url[start + 3:]
+        elif url.startswith('//'):
+            rest = url[2:]
+        else:
             return ''
+        
+        # 主机部分到第一个 / ? # 为止，路径不含查询参数和片段
+        end = len(rest)
+        for sep in '/?#':
+            pos = rest.find(sep)
+            if 0 <= pos < end:
+                end = pos
+        # 去掉端口号
+        domain = rest[:end].split(':', 1)[0]
+        
+        # 移除www.和.com等后缀
+        domain_parts = domain.split('.')
+        if len(domain_parts) >= 2:
+            # 提取核心域名
+            if domain_parts[0] == 'www':
+                keyword = domain_parts[1]
+            else:
+                keyword = domain_parts[0]
+            # 处理特殊情况
+            if keyword == 'github':
+                # 从路径中提取项目名
+                path = rest[end:]
+                for sep in '?#':
+                    path = path.split(sep, 1)[0]
+                # 与urlparse一致，去掉最后一段路径中的;参数
+                params = path.find(';', path.rfind('/'))
+                if params >= 0:
+                    path = path[:params]
+                path_parts = path.strip('/').split('/')
+                if len(path_parts) >= 2:
+                    keyword = f"{path_parts[0]}_{path_parts[1]}"
+            return keyword
+        return ''
     
     def _extract_keyword_alias(self, title: str) -> str:
         """
@@ -510,9 +637,8 @@ class BookmarkAnalyzer(ScriptInterface):
             关键词组合
         """
         # 提取核心关键词
-        import re
         # 移除特殊符号
-        clean = re.sub(r'[^\w\u4e00-\u9fa5]', ' ', title)
+        clean = _RE_NONWORD.sub(' ', title)
         words = clean.split()
         # 提取最长的几个关键词
         if len(words) > 3:
@@ -531,20 +657,42 @@ class BookmarkAnalyzer(ScriptInterface):
         Returns:
             类别列表
         """
-        title = bookmark.get('title', '')
-        url = bookmark.get('url', '')
+        return list(self._category_cached(bookmark.get('title', ''), bookmark.get('url', '')))
+    
+    def _category_core(self, title: str, url: str) -> tuple:
+        """
+        根据标题和URL分析类别
+        
+        Args:
+            title: 书签标题
+            url: 书签URL
+        
+        Returns:
+            类别元组
+        """
         categories = []
         
+        # 标题和URL只转换一次小写，并一次扫描出全部关键词，供两种分类方式共用
+        title_lower = title.lower()
+        url_lower = url.lower()
+        keyword_hits = self._scan_keywords(title_lower, url_lower)
+        
         # 获取传统关键词分类结果
-        traditional_categories = self._traditional_keyword_classification(title, url)
+        traditional_categories = self._traditional_keyword_classification(keyword_hits)
+        
+        # 混合分类模式下传统分类结果已排在前面，已满max_suggestions个类别时AI结果会被截掉，无需调用AI分类
+        max_suggestions = self.config['max_suggestions']
+        if (self.config['use_ai_classification'] and self.config['hybrid_classification']
+                and len(traditional_categories) >= max_suggestions):
+            return tuple(traditional_categories[:max_suggestions])
         
         if self.config['use_ai_classification']:
             # 获取AI分类结果
-            ai_categories = self._ai_classification(title, url)
+            ai_categories = self._ai_classification(title, url, title_lower, url_lower, keyword_hits)
             
             if self.config['hybrid_classification']:
-                # 混合分类模式：合并AI和传统分类结果，去重
-                categories = list(set(traditional_categories + ai_categories))
+                # 混合分类模式：合并AI和传统分类结果，按出现顺序去重
+                categories = list(dict.fromkeys(traditional_categories + ai_categories))
                 logger.debug(f"混合分类结果: {categories}")
             else:
                 # 纯AI分类模式
@@ -559,46 +707,89 @@ class BookmarkAnalyzer(ScriptInterface):
         if not categories:
             categories.append('其他')
         
-        return categories[:3]  # 限制最多3个类别
+        return tuple(categories[:max_suggestions])  # 限制最多max_suggestions个类别
     
-    def _traditional_keyword_classification(self, title: str, url: str) -> List[str]:
+    def _build_keyword_automaton(self):
         """
-        传统关键词分类
+        构建全部关键词的Aho-Corasick自动机
+        
+        Returns:
+            自动机对象，每个关键词对应其自身；未安装pyahocorasick时返回None
+        """
+        if ahocorasick is None:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for keyword in self._keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+    
+    def _scan_keywords(self, title_lower: str, url_lower: str) -> tuple:
+        """
+        一次扫描找出标题和URL中出现的全部关键词
         
         Args:
-            title: 书签标题
-            url: 书签URL
+            title_lower: 小写的书签标题
+            url_lower: 小写的书签URL
         
         Returns:
-            类别列表
+            (标题中出现的关键词集合, URL中出现的关键词集合)
         """
-        title_lower = title.lower()
-        url_lower = url.lower()
-        categories = []
+        if self._keyword_automaton is not None:
+            title_hits = set()
+            url_hits = set()
+            # 标题和URL用换行分隔，关键词不会跨越两者匹配
+            title_end = len(title_lower)
+            for end, keyword in self._keyword_automaton.iter(title_lower + '\n' + url_lower):
+                if end < title_end:
+                    title_hits.add(keyword)
+                else:
+                    url_hits.add(keyword)
+            return title_hits, url_hits
         
-        # 遍历关键词映射，查找匹配的类别
-        for category, keywords in self.category_keywords.items():
-            for keyword in keywords:
-                if keyword in title_lower or keyword in url_lower:
-                    categories.append(category)
-                    break
+        return (
+            {keyword for keyword in self._keywords if keyword in title_lower},
+            {keyword for keyword in self._keywords if keyword in url_lower}
+        )
+    
+    def _traditional_keyword_classification(self, keyword_hits: tuple) -> List[str]:
+        """
+        传统关键词分类
+        
+        Args:
+            keyword_hits: 标题和URL中出现的关键词集合(标题命中, URL命中)
         
-        return categories
+        Returns:
+            类别列表
+        """
+        title_hits, url_hits = keyword_hits
+        
+        # 按类别定义顺序查找匹配的类别
+        return [
+            category
+            for category, keywords in self.category_keywords.items()
+            if not title_hits.isdisjoint(keywords) or not url_hits.isdisjoint(keywords)
+        ]
     
-    def _ai_classification(self, title: str, url: str) -> List[str]:
+    def _ai_classification(self, title: str, url: str, title_lower: str, url_lower: str,
+                           keyword_hits: tuple) -> List[str]:
         """
         AI分类
         
         Args:
             title: 书签标题
             url: 书签URL
+            title_lower: 小写的书签标题
+            url_lower: 小写的书签URL
+            keyword_hits: 标题和URL中出现的关键词集合(标题命中, URL命中)
         
         Returns:
             类别列表
         """
         try:
             # 调用AI分类器
-            ai_categories = self.ai_classifier.classify(title, url)
+            ai_categories = self.ai_classifier.classify(title, url, title_lower, url_lower, keyword_hits)
             logger.debug(f"AI分类器返回: {ai_categories}")
             
             # 验证AI返回的类别是否在可用类别列表中
@@ -619,40 +810,95 @@ class BookmarkAnalyzer(ScriptInterface):
         Returns:
             分组建议列表
         """
-        groups = []
-        
-        # 根据类别生成分组建议
-        for category in categories:
-            if category in self.group_suggestions:
-                groups.extend(self.group_suggestions[category])
-        
-        # 去重
-        groups = list(set(groups))
+        # 根据类别生成分组建议，按出现顺序去重，保证截取的建议稳定
+        groups = list(dict.fromkeys(
+            group for category in categories for group in self.group_suggestions.get(category, ())
+        ))
         
         # 如果没有生成分组建议，添加默认建议
         if not groups:
             groups = ['未分类', '其他']
         
-        return groups[:3]  # 限制最多3个分组建议
+        return groups[:self.config['max_suggestions']]  # 限制最多max_suggestions个分组建议
     
-    def analyze_bookmarks(self, bookmarks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def analyze_bookmarks(self, bookmarks: List[Dict[str, Any]], include_date: bool = True) -> List[Dict[str, Any]]:
         """
         分析所有书签，生成建议
         
         Args:
             bookmarks: 书签列表
+            include_date: 结果中是否包含分析时间，CSV和文本输出不使用该字段
         
         Returns:
             带建议的书签列表
         """
-        results = []
+        return list(self.iter_analysis(bookmarks, include_date))
+    
+    def iter_analysis(self, bookmarks: List[Dict[str, Any]], include_date: bool = True,
+                      parallel: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        逐条生成书签分析结果，供写入输出时边分析边写入，不在内存中保存全部结果
+        
+        Args:
+            bookmarks: 书签列表
+            include_date: 结果中是否包含分析时间，CSV和文本输出不使用该字段
+            parallel: 是否允许多进程分析，仅命令行执行时使用；应用进程中有多个线程，不能fork子进程
+        
+        Returns:
+            按原顺序逐条产生的带建议书签
+        """
+        # 同一批书签共用一个分析时间
+        analysis_date = datetime.now().isoformat() if include_date else None
+        
+        # 子进程需要通过fork继承控制器加载的脚本模块，spawn方式启动的子进程无法导入该模块
+        if (not parallel or len(bookmarks) < self.config['parallel_threshold']
+                or 'fork' not in multiprocessing.get_all_start_methods()):
+            yield from self._iter_chunk(bookmarks, analysis_date)
+            return
+        
+        # 书签较多时分块交给多个进程并行分析，结果按原顺序产生
+        workers = self.config['max_workers'] or os.cpu_count() or 1
+        chunk_size = max(1, len(bookmarks) // (workers * 4))
+        chunks = [bookmarks[i:i + chunk_size] for i in range(0, len(bookmarks), chunk_size)]
+        
+        started = False
+        try:
+            # 分析器通过初始化函数在每个子进程中只传递一次，各块任务只传递书签
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'),
+                                     initializer=_init_worker, initargs=(self,)) as executor:
+                chunk_results = executor.map(_analyze_chunk, chunks, [analysis_date] * len(chunks))
+                for chunk_result in chunk_results:
+                    started = True
+                    yield from chunk_result
+        except Exception as e:
+            # 已经产生过结果时无法改为单进程重新分析，避免结果重复
+            if started:
+                raise
+            logger.warning(f"多进程分析失败，改为单进程分析: {str(e)}")
+            yield from self._iter_chunk(bookmarks, analysis_date)
+    
+    def _iter_chunk(self, bookmarks: List[Dict[str, Any]],
+                    analysis_date: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """
+        在当前进程中逐个分析书签
         
-        for bookmark in bookmarks:
+        Args:
+            bookmarks: 书签列表
+            analysis_date: 分析时间（ISO格式），为None时结果中不包含该字段
+        
+        Returns:
+            逐条产生的带建议书签
+        """
+        # 一次性取出标题和URL，后续各步骤直接使用，不再逐步从书签字典中查找
+        titles = [bookmark.get('title', '') for bookmark in bookmarks]
+        urls = [bookmark.get('url', '') for bookmark in bookmarks]
+        
+        for bookmark, title, url in zip(bookmarks, titles, urls):
             # 生成别名建议
-            alias_suggestions = self.generate_alias_suggestions(bookmark)
+            alias_suggestions = list(self._alias_cached(title, url))
             
             # 分析类别
-            categories = self.analyze_category(bookmark)
+            categories = list(self._category_cached(title, url))
             
             # 生成分组建议
             group_suggestions = self.suggest_groups(categories)
@@ -662,36 +908,86 @@ class BookmarkAnalyzer(ScriptInterface):
                 'original': bookmark,
                 'alias_suggestions': alias_suggestions,
                 'category_suggestions': categories,
-                'group_suggestions': group_suggestions,
-                'analysis_date': datetime.now().isoformat()
+                'group_suggestions': group_suggestions
             }
-            results.append(result)
+            if analysis_date is not None:
+                result['analysis_date'] = analysis_date
+            yield result
+    
+    def _remove_partial_output(self, output_file: str):
+        """
+        删除未写完的输出文件
         
-        return results
+        Args:
+            output_file: 输出文件路径
+        """
+        try:
+            os.remove(output_file)
+        except OSError:
+            pass
     
-    def write_json_output(self, results: List[Dict[str, Any]], output_file: str):
+    def write_json_output(self, results: Iterable[Dict[str, Any]], output_file: str) -> int:
         """
-        写入JSON格式输出
+        写入JSON格式输出，逐条序列化结果，不需要一次性保存全部结果
         
         Args:
             results: 分析结果
             output_file: 输出文件路径
+        
+        Returns:
+            写入的结果数量
         """
+        count = 0
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+            if orjson is not None:
+                def dumps(result):
+                    return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+            else:
+                def dumps(result):
+                    return json.dumps(result, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+            
+            with open(output_file, 'wb') as f:
+                # 与整体序列化数组的格式一致：每个元素缩进2个空格
+                for result in results:
+                    f.write(b'[\n  ' if count == 0 else b',\n  ')
+                    f.write(dumps(result).replace(b'\n', b'\n  '))
+                    count += 1
+                f.write(b'\n]' if count else b'[]')
             logger.info(f"JSON结果已写入: {output_file}")
-        except Exception as e:
+        except OSError as e:
             logger.error(f"写入JSON文件失败: {str(e)}")
+        except Exception:
+            # 结果边分析边写入，分析出错时删除未写完的输出文件，由execute返回错误
+            self._remove_partial_output(output_file)
+            raise
+        return count
     
-    def write_csv_output(self, results: List[Dict[str, Any]], output_file: str):
+    def write_csv_output(self, results: Iterable[Dict[str, Any]], output_file: str) -> int:
         """
         写入CSV格式输出
         
         Args:
             results: 分析结果
             output_file: 输出文件路径
+        
+        Returns:
+            写入的结果数量
         """
+        count = 0
+        
+        def rows():
+            nonlocal count
+            for result in results:
+                count += 1
+                yield (
+                    result['original'].get('title', ''),
+                    result['original'].get('url', ''),
+                    result['original'].get('group', ''),
+                    *_pad_columns(result['alias_suggestions']),
+                    *_pad_columns(result['category_suggestions']),
+                    *_pad_columns(result['group_suggestions'])
+                )
+        
         try:
             with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
                 # 定义CSV字段
@@ -701,73 +997,131 @@ class BookmarkAnalyzer(ScriptInterface):
                     'category_1', 'category_2', 'category_3',
                     'group_suggestion_1', 'group_suggestion_2', 'group_suggestion_3'
                 ]
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer = csv.writer(f)
                 
                 # 写入表头
-                writer.writeheader()
+                writer.writerow(fieldnames)
                 
-                # 写入数据
-                for result in results:
-                    original = result['original']
-                    alias_suggestions = result['alias_suggestions']
-                    category_suggestions = result['category_suggestions']
-                    group_suggestions = result['group_suggestions']
-                    
-                    # 构建行数据
-                    row = {
-                        'original_title': original.get('title', ''),
-                        'original_url': original.get('url', ''),
-                        'original_group': original.get('group', ''),
-                        'alias_1': alias_suggestions[0] if len(alias_suggestions) > 0 else '',
-                        'alias_2': alias_suggestions[1] if len(alias_suggestions) > 1 else '',
-                        'alias_3': alias_suggestions[2] if len(alias_suggestions) > 2 else '',
-                        'category_1': category_suggestions[0] if len(category_suggestions) > 0 else '',
-                        'category_2': category_suggestions[1] if len(category_suggestions) > 1 else '',
-                        'category_3': category_suggestions[2] if len(category_suggestions) > 2 else '',
-                        'group_suggestion_1': group_suggestions[0] if len(group_suggestions) > 0 else '',
-                        'group_suggestion_2': group_suggestions[1] if len(group_suggestions) > 1 else '',
-                        'group_suggestion_3': group_suggestions[2] if len(group_suggestions) > 2 else ''
-                    }
-                    writer.writerow(row)
+                # 写入数据，字段顺序与表头一致，每类建议补齐为3列
+                writer.writerows(rows())
             logger.info(f"CSV结果已写入: {output_file}")
-        except Exception as e:
+        except OSError as e:
             logger.error(f"写入CSV文件失败: {str(e)}")
+        except Exception:
+            # 结果边分析边写入，分析出错时删除未写完的输出文件，由execute返回错误
+            self._remove_partial_output(output_file)
+            raise
+        return count
     
-    def write_text_output(self, results: List[Dict[str, Any]], output_file: str):
+    def write_text_output(self, results: Iterable[Dict[str, Any]], output_file: str) -> int:
         """
         写入格式化文本输出
         
         Args:
             results: 分析结果
             output_file: 输出文件路径
+        
+        Returns:
+            写入的结果数量
         """
+        count = 0
         try:
             with open(output_file, 'w', encoding='utf-8') as f:
+                # 先拼接文本，每10000条书签写入一次
+                parts = []
                 for i, result in enumerate(results, 1):
                     original = result['original']
-                    f.write(f"\n{'='*50}\n")
-                    f.write(f"书签 {i}: {original.get('title', '无标题')}\n")
-                    f.write(f"{'='*50}\n")
-                    f.write(f"URL: {original.get('url', '无URL')}\n")
-                    f.write(f"当前分组: {original.get('group', '无分组')}\n")
-                    f.write(f"\n1. 别名建议:\n")
+                    parts.append(f"\n{'='*50}\n")
+                    parts.append(f"书签 {i}: {original.get('title', '无标题')}\n")
+                    parts.append(f"{'='*50}\n")
+                    parts.append(f"URL: {original.get('url', '无URL')}\n")
+                    parts.append(f"当前分组: {original.get('group', '无分组')}\n")
+                    parts.append(f"\n1. 别名建议:\n")
                     for j, alias in enumerate(result['alias_suggestions'], 1):
-                        f.write(f"   {j}. {alias}\n")
-                    f.write(f"\n2. 分类建议:\n")
+                        parts.append(f"   {j}. {alias}\n")
+                    parts.append(f"\n2. 分类建议:\n")
                     for j, category in enumerate(result['category_suggestions'], 1):
-                        f.write(f"   {j}. {category}\n")
-                    f.write(f"\n3. 分组建议:\n")
+                        parts.append(f"   {j}. {category}\n")
+                    parts.append(f"\n3. 分组建议:\n")
                     for j, group in enumerate(result['group_suggestions'], 1):
-                        f.write(f"   {j}. {group}\n")
+                        parts.append(f"   {j}. {group}\n")
+                    count = i
+                    if i % 10000 == 0:
+                        f.write(''.join(parts))
+                        parts.clear()
+                f.write(''.join(parts))
             logger.info(f"文本结果已写入: {output_file}")
-        except Exception as e:
+        except OSError as e:
             logger.error(f"写入文本文件失败: {str(e)}")
+        except Exception:
+            # 结果边分析边写入，分析出错时删除未写完的输出文件，由execute返回错误
+            self._remove_partial_output(output_file)
+            raise
+        return count
+
+
+def _pad_columns(values: List[str], count: int = 3) -> List[str]:
+    """
+    截取前count个值，不足时用空字符串补齐，用于CSV输出
+    
+    Args:
+        values: 值列表
+        count: 列数
+    
+    Returns:
+        长度为count的列表
+    """
+    columns = list(values[:count])
+    return columns + [''] * (count - len(columns))
+
+
+# 子进程中使用的书签分析器，由_init_worker设置
+_worker_analyzer: Optional[BookmarkAnalyzer] = None
+
+
+def _init_worker(analyzer: BookmarkAnalyzer) -> None:
+    """
+    子进程初始化函数，保存父进程传入的书签分析器
+    
+    Args:
+        analyzer: 书签分析器
+    """
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _analyze_chunk(bookmarks: List[Dict[str, Any]],
+                   analysis_date: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    在子进程中分析一块书签，供多进程分析调用
+    
+    Args:
+        bookmarks: 书签列表
+        analysis_date: 分析时间（ISO格式），为None时结果中不包含该字段
+    
+    Returns:
+        带建议的书签列表
+    """
+    return list(_worker_analyzer._iter_chunk(bookmarks, analysis_date))
+
+
+# 脚本控制器注册时直接使用该类，无需扫描模块中的所有属性
+__script_class__ = BookmarkAnalyzer
 
 
 def main():
     """
     主函数
     """
+    # 直接运行时配置日志，作为应用模块导入时由应用入口统一配置
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - [analyzer] %(message)s',
+        handlers=[
+            logging.StreamHandler()
+        ]
+    )
+    
     # 初始化分析器
     analyzer = BookmarkAnalyzer()
     
@@ -19,11 +19,11 @@ python bookmark_parser.py <input_file> [output_file]
   output_file: 输出的JSON文件路径（可选，默认：bookmarks.json）
 
 依赖：
-- beautifulsoup4
 - lxml
+- 可选：orjson，安装后使用orjson写入JSON
 
 配置项：
-- MAX_NESTING_DEPTH: 最大嵌套深度限制，防止过深嵌套导致栈溢出
+- MAX_NESTING_DEPTH: 最大嵌套深度限制，超过该深度的文件夹会被跳过
 - MAX_ALIAS_LENGTH: 别名最大长度限制
 - ALLOW_DUPLICATE_ALIASES: 是否允许重复别名
 
@@ -41,69 +41,44 @@ import os
 import sys
 import json
 import logging
+from collections import Counter, deque
 from datetime import datetime
-from bs4 import BeautifulSoup
+from functools import lru_cache
+import lxml.html
 from typing import List, Dict, Any
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - [parser] %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from app.scripts.interface import ScriptInterface
+except ImportError:
+    # 直接运行脚本时，脚本所在目录位于sys.path中
+    from interface import ScriptInterface
+
 logger = logging.getLogger('parser')
 
+# 书签文件统一按UTF-8解码，字节内容中没有声明编码时也不会按Latin-1解析
+_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
 
-class ScriptInterface:
-    """
-    脚本接口基类，定义标准化接口
+# 视为有效的书签URL前缀
+_URL_SCHEMES = ('http://', 'https://', 'chrome://', 'ftp://', 'file://')
+
+
+@lru_cache(maxsize=8192)
+def _timestamp_to_iso(timestamp: int) -> str:
     """
+    将Unix时间戳转换为ISO格式的本地时间，批量导入的书签常有相同的时间戳，结果会被缓存
     
-    def __init__(self):
-        self.name = ""
-        self.description = ""
-        self.version = "1.0.0"
-        self.author = ""
-    
-    def configure(self, config: Dict[str, Any]) -> bool:
-        """
-        配置脚本
-        
-        Args:
-            config: 配置参数
-        
-        Returns:
-            bool: 配置是否成功
-        """
-        return True
+    Args:
+        timestamp: Unix时间戳
     
-    def execute(self, args: List[str]) -> Dict[str, Any]:
-        """
-        执行脚本
-        
-        Args:
-            args: 命令行参数
-        
-        Returns:
-            Dict: 执行结果，包含status和data字段
-        """
-        return {"status": "success", "data": {}}
-    
-    def get_info(self) -> Dict[str, Any]:
-        """
-        获取脚本信息
-        
-        Returns:
-            Dict: 脚本信息
-        """
-        return {
-            "name": self.name,
-            "description": self.description,
-            "version": self.version,
-            "author": self.author
-        }
+    Returns:
+        str: ISO格式的时间字符串
+    """
+    return datetime.fromtimestamp(timestamp).isoformat()
 
 
 class BookmarkParser(ScriptInterface):
@@ -176,11 +151,11 @@ class BookmarkParser(ScriptInterface):
             if not input_file.lower().endswith('.html'):
                 logger.warning(f"输入文件不是HTML格式: {input_file}")
             
-            # 读取HTML文件，限制文件大小以提高安全性
-            with open(input_file, 'r', encoding='utf-8') as f:
+            # 以字节形式读取HTML文件，由lxml解码，不先解码为Python字符串，限制文件大小以提高安全性
+            with open(input_file, 'rb') as f:
+                if os.fstat(f.fileno()).st_size > self.config["MAX_FILE_SIZE"]:
+                    logger.warning(f"输入文件超过最大限制 {self.config['MAX_FILE_SIZE']} bytes，已被截断")
                 html_content = f.read(self.config["MAX_FILE_SIZE"])
-                if len(html_content) == self.config["MAX_FILE_SIZE"]:
-                    logger.warning(f"输入文件超过最大限制 {self.config['MAX_FILE_SIZE']} bytes，可能被截断")
             logger.info(f"成功读取文件: {input_file}")
             
             # 解析书签
@@ -209,13 +184,38 @@ class BookmarkParser(ScriptInterface):
                 "status": "error",
                 "message": error_msg
             }
-        except UnicodeDecodeError:
-            error_msg = f"文件编码错误，请确保是UTF-8编码: {args[0] if args else '未知文件'}"
+        except Exception as e:
+            error_msg = f"程序执行失败: {str(e)}"
             logger.error(error_msg)
             return {
                 "status": "error",
                 "message": error_msg
             }
+    
+    def process(self, data: Any) -> Dict[str, Any]:
+        """
+        在内存中解析书签，不读写文件
+        
+        Args:
+            data: HTML书签内容，可以是字符串、字节或文件对象
+        
+        Returns:
+            Dict: 执行结果，data字段包含解析后的书签数组
+        """
+        try:
+            if hasattr(data, 'read'):
+                data = data.read(self.config["MAX_FILE_SIZE"])
+            
+            bookmarks = self.parse_bookmarks(data)
+            
+            return {
+                "status": "success",
+                "message": "书签解析成功",
+                "data": {
+                    "bookmarks": bookmarks,
+                    "bookmark_count": len(bookmarks)
+                }
+            }
         except Exception as e:
             error_msg = f"程序执行失败: {str(e)}"
             logger.error(error_msg)
@@ -229,90 +229,130 @@ class BookmarkParser(ScriptInterface):
         解析HTML书签内容
         
         Args:
-            html_content (str): HTML书签文件内容
+            html_content (str | bytes): HTML书签文件内容，字节内容按UTF-8解码
         
         Returns:
             list: 解析后的书签数组
+        
+        Raises:
+            Exception: HTML内容无法解析时抛出，由调用方返回错误结果
         """
-        try:
-            # 使用BeautifulSoup解析HTML
-            soup = BeautifulSoup(html_content, 'lxml')
-            logger.info("HTML内容解析成功")
-            
-            # 查找根目录的DL标签
-            root_dl = soup.find('dl')
-            if not root_dl:
-                logger.error("未找到书签根目录DL标签")
-                return []
-            
-            # 解析书签结构
-            bookmarks = []
-            self.parse_dl_element(root_dl, bookmarks, [], 0)
-            
-            # 验证别名唯一性
-            if not self.config["ALLOW_DUPLICATE_ALIASES"]:
-                self.validate_alias_uniqueness(bookmarks)
-            
-            logger.info(f"成功解析 {len(bookmarks)} 个书签")
-            return bookmarks
-            
-        except RecursionError:
-            logger.error(f"解析失败：书签嵌套深度超过最大限制 {self.config['MAX_NESTING_DEPTH']}")
+        if not html_content or not html_content.strip():
+            logger.warning("HTML内容为空")
             return []
-        except Exception as e:
-            logger.error(f"解析HTML内容失败: {str(e)}")
+        
+        # 使用lxml直接解析HTML
+        root = lxml.html.document_fromstring(html_content, parser=_HTML_PARSER)
+        logger.info("HTML内容解析成功")
+        
+        # 查找根目录的DL标签
+        root_dl = next(root.iter('dl'), None)
+        if root_dl is None:
+            logger.error("未找到书签根目录DL标签")
             return []
+        
+        # 解析书签结构
+        bookmarks = []
+        self.parse_dl_element(root_dl, bookmarks)
+        
+        # 验证别名唯一性
+        if not self.config["ALLOW_DUPLICATE_ALIASES"]:
+            self.validate_alias_uniqueness(bookmarks)
+        
+        logger.info(f"成功解析 {len(bookmarks)} 个书签")
+        return bookmarks
 
-    def parse_dl_element(self, dl_element, bookmarks, current_tags, current_depth):
+    def parse_dl_element(self, root_dl, bookmarks):
         """
-        递归解析DL元素，提取书签和文件夹
+        用显式栈遍历DL元素，按文档顺序提取书签和文件夹
         
         Args:
-            dl_element (bs4.element.Tag): DL标签元素
+            root_dl (lxml.html.HtmlElement): 根目录DL标签元素
             bookmarks (list): 书签数组
-            current_tags (list): 当前文件夹路径
-            current_depth (int): 当前嵌套深度
         """
-        # 检查嵌套深度限制
-        if current_depth > self.config["MAX_NESTING_DEPTH"]:
-            logger.warning(f"跳过深度为 {current_depth} 的文件夹，超过最大限制")
-            return
+        # 栈中保存(DT子元素迭代器, 文件夹路径, 嵌套深度)，子文件夹处理完后继续处理父文件夹的剩余元素
+        stack = deque([(root_dl.iterchildren('dt'), (), 0)])
+        max_depth = self.config["MAX_NESTING_DEPTH"]
         
-        # 遍历所有子元素
-        for child in dl_element.children:
-            # 跳过文本节点和空节点
-            if child.name is None:
+        while stack:
+            dt_iter, current_tags, current_depth = stack[-1]
+            child = next(dt_iter, None)
+            if child is None:
+                stack.pop()
+                continue
+            
+            folder_name, next_dl = self.parse_dt_element(child, bookmarks, current_tags)
+            if folder_name is None:
+                continue
+            
+            # 文件夹下的DL通常是DT之后的兄弟元素，中间可能隔着<p>
+            if next_dl is None:
+                sibling = child.getnext()
+                while sibling is not None and sibling.tag == 'p':
+                    sibling = sibling.getnext()
+                if sibling is not None and sibling.tag == 'dl':
+                    next_dl = sibling
+            
+            if next_dl is None:
                 continue
             
-            # 处理文件夹节点 <DT><H3>...</H3></DT>
-            if child.name == 'dt':
-                h3_tag = child.find('h3')
-                if h3_tag:
-                    # 获取文件夹名称和属性
-                    folder_name = h3_tag.get_text(strip=True)
-                    new_tags = current_tags.copy()
-                    new_tags.append(folder_name)
-                    
-                    # 查找文件夹下的DL子元素
-                    next_dl = child.find_next_sibling('dl')
-                    if next_dl:
-                        # 递归处理子文件夹，深度+1
-                        self.parse_dl_element(next_dl, bookmarks, new_tags, current_depth + 1)
+            # 检查嵌套深度限制
+            if current_depth + 1 > max_depth:
+                logger.warning("跳过深度为 %d 的文件夹，超过最大限制", current_depth + 1)
+                continue
             
-            # 处理书签节点 <DT><A>...</A></DT>
-            a_tag = child.find('a')
-            if a_tag:
-                bookmark = self.parse_bookmark_element(a_tag, current_tags)
-                if bookmark:
-                    bookmarks.append(bookmark)
+            # 子文件夹路径共享父路径前缀，深度+1
+            stack.append((next_dl.iterchildren('dt'), current_tags + (folder_name,), current_depth + 1))
+
+    def parse_dt_element(self, dt_element, bookmarks, current_tags):
+        """
+        解析DT元素中的书签和文件夹标题
+        
+        书签文件中的<DT>没有结束标签，lxml会把同级的后续DT嵌套在前一个DT内，
+        这里沿着这条DT链依次处理每一级的A和H3标签
+        
+        Args:
+            dt_element (lxml.html.HtmlElement): DT标签元素
+            bookmarks (list): 书签数组
+            current_tags (tuple): 当前文件夹路径
+        
+        Returns:
+            tuple: (文件夹名称, 文件夹DL元素)，不是文件夹时名称为None，DL不在DT内时为None
+        """
+        folder_name = None
+        folder_dl = None
+        
+        # 循环中按书签逐个调用，预先绑定方法
+        parse_bookmark_element = self.parse_bookmark_element
+        append_bookmark = bookmarks.append
+        
+        while dt_element is not None:
+            next_dt = None
+            for child in dt_element.iterchildren('a', 'h3', 'dl', 'dt'):
+                tag = child.tag
+                # 处理书签节点 <DT><A>...</A>
+                if tag == 'a':
+                    bookmark = parse_bookmark_element(child, current_tags)
+                    if bookmark:
+                        append_bookmark(bookmark)
+                # 处理文件夹节点 <DT><H3>...</H3>
+                elif tag == 'h3':
+                    folder_name = child.text_content().strip()
+                elif tag == 'dl':
+                    folder_dl = child
+                else:
+                    next_dt = child
+            dt_element = next_dt
+        
+        return folder_name, folder_dl
 
     def parse_bookmark_element(self, a_tag, tags):
         """
         解析单个书签元素
         
         Args:
-            a_tag (bs4.element.Tag): A标签元素
-            tags (list): 书签所属文件夹路径
+            a_tag (lxml.html.HtmlElement): A标签元素
+            tags (tuple): 书签所属文件夹路径
         
         Returns:
             dict: 解析后的书签对象
@@ -323,28 +363,26 @@ class BookmarkParser(ScriptInterface):
             # 否则group为空字符串
             group = tags[-1] if tags else ""
             
-            # 提取别名信息
-            # 检查是否有别名属性或内容
-            alias = a_tag.get('alias', '')
-            if not alias:
-                # 尝试从title属性或其他可能的字段中提取别名
-                # 这里可以根据实际HTML格式扩展
-                alias = ""
+            # 提取别名信息，浏览器导出的书签通常没有别名
+            # 这里可以根据实际HTML格式扩展，从title属性或其他字段中提取别名
+            alias = a_tag.get('alias') or ''
             
-            # 验证别名长度
-            if len(alias) > self.config["MAX_ALIAS_LENGTH"]:
-                logger.warning(f"书签别名过长，已截断: {alias[:20]}...")
-                alias = alias[:self.config["MAX_ALIAS_LENGTH"]]
+            # 只有存在别名时才验证别名长度
+            if alias:
+                max_alias_length = self.config["MAX_ALIAS_LENGTH"]
+                if len(alias) > max_alias_length:
+                    logger.warning("书签别名过长，已截断: %s...", alias[:20])
+                    alias = alias[:max_alias_length]
             
-            # 提取核心字段
+            # 提取核心字段，字段按键名排序插入，写入JSON时无需再逐条排序
             bookmark = {
-                'title': a_tag.get_text(strip=True),
-                'url': a_tag.get('href', ''),
+                'alias': alias,
                 'date': self.parse_timestamp(a_tag.get('add_date')),
-                'tags': tags.copy(),
+                'description': a_tag.get('description', ''),
                 'group': group,
-                'alias': alias,
-                'description': a_tag.get('description', '')
+                'tags': tags,  # 同一文件夹的书签共用同一个路径元组，序列化时输出为数组
+                'title': a_tag.text_content().strip(),
+                'url': a_tag.get('href', '')
             }
             
             # 验证必填字段
@@ -353,15 +391,14 @@ class BookmarkParser(ScriptInterface):
                 return None
             
             # 验证URL格式（简单验证）
-            if bookmark['url'] and not (bookmark['url'].startswith('http://') or 
-                                       bookmark['url'].startswith('https://') or 
-                                       bookmark['url'].startswith('chrome://')):
-                logger.warning(f"书签URL格式可能无效: {bookmark['url']}")
+            url = bookmark['url']
+            if url and not url.startswith(_URL_SCHEMES):
+                logger.warning("书签URL格式可能无效: %s", url)
             
             return bookmark
             
         except Exception as e:
-            logger.error(f"解析书签元素失败: {str(e)}")
+            logger.error("解析书签元素失败: %s", e)
             return None
 
     def parse_timestamp(self, timestamp_str):
@@ -379,11 +416,9 @@ class BookmarkParser(ScriptInterface):
         
         try:
             # 将Unix时间戳转换为ISO格式
-            timestamp = int(timestamp_str)
-            dt = datetime.fromtimestamp(timestamp)
-            return dt.isoformat()
+            return _timestamp_to_iso(int(timestamp_str))
         except ValueError:
-            logger.warning(f"无效的时间戳: {timestamp_str}")
+            logger.warning("无效的时间戳: %s", timestamp_str)
             return ''
 
     def validate_alias_uniqueness(self, bookmarks):
@@ -393,14 +428,11 @@ class BookmarkParser(ScriptInterface):
         Args:
             bookmarks (list): 书签数组
         """
-        alias_set = set()
-        for bookmark in bookmarks:
-            alias = bookmark.get('alias', '')
-            if alias:
-                if alias in alias_set:
-                    logger.warning(f"发现重复别名: {alias}")
-                else:
-                    alias_set.add(alias)
+        # 一次遍历统计所有别名，每个重复别名只记录一条日志
+        alias_counts = Counter(bookmark['alias'] for bookmark in bookmarks if bookmark.get('alias'))
+        for alias, count in alias_counts.items():
+            if count > 1:
+                logger.warning(f"发现重复别名: {alias}（{count} 次）")
 
     def write_json_output(self, data, output_file):
         """
@@ -413,12 +445,18 @@ class BookmarkParser(ScriptInterface):
         try:
             # 确保输出目录存在
             output_dir = os.path.dirname(output_file)
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                # 使用更高效的JSON序列化，禁用ensure_ascii以支持中文
-                json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+            if orjson is not None:
+                # orjson一次序列化为UTF-8字节，通过64KB缓冲写入
+                with open(output_file, 'wb', buffering=65536) as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+            else:
+                with open(output_file, 'w', encoding='utf-8', buffering=65536) as f:
+                    # 书签字段已按键名顺序构建，不再逐条排序；json.dump逐段编码写入，不生成完整字符串
+                    # 禁用ensure_ascii以支持中文
+                    json.dump(data, f, ensure_ascii=False, indent=2)
             logger.info(f"JSON数据已成功写入: {output_file}")
         except PermissionError:
             raise PermissionError(f"写入文件失败：没有写入权限 {output_file}")
@@ -426,8 +464,21 @@ class BookmarkParser(ScriptInterface):
             raise Exception(f"写入JSON文件失败: {str(e)}")
 
 
+# 脚本控制器注册时直接使用该类，无需扫描模块中的所有属性
+__script_class__ = BookmarkParser
+
+
 # 用于直接执行的主函数
 if __name__ == "__main__":
+    # 直接运行时配置日志，作为应用模块导入时由应用入口统一配置
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - [parser] %(message)s',
+        handlers=[
+            logging.StreamHandler()
+        ]
+    )
+    
     parser = BookmarkParser()
     result = parser.execute(sys.argv[1:])
     print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -36,65 +36,13 @@ import json
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - [%(name)s] %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger('controller')
-
+try:
+    from app.scripts.interface import ScriptInterface
+except ImportError:
+    # 直接运行脚本时，脚本所在目录位于sys.path中
+    from interface import ScriptInterface
 
-class ScriptInterface:
-    """
-    脚本接口基类，定义标准化接口
-    """
-    
-    def __init__(self):
-        self.name = ""
-        self.description = ""
-        self.version = "1.0.0"
-        self.author = ""
-    
-    def configure(self, config: Dict[str, Any]) -> bool:
-        """
-        配置脚本
-        
-        Args:
-            config: 配置参数
-        
-        Returns:
-            bool: 配置是否成功
-        """
-        return True
-    
-    def execute(self, args: List[str]) -> Dict[str, Any]:
-        """
-        执行脚本
-        
-        Args:
-            args: 命令行参数
-        
-        Returns:
-            Dict: 执行结果，包含status和data字段
-        """
-        return {"status": "success", "data": {}}
-    
-    def get_info(self) -> Dict[str, Any]:
-        """
-        获取脚本信息
-        
-        Returns:
-            Dict: 脚本信息
-        """
-        return {
-            "name": self.name,
-            "description": self.description,
-            "version": self.version,
-            "author": self.author
-        }
+logger = logging.getLogger('controller')
 
 
 class ScriptController:
@@ -109,6 +57,8 @@ class ScriptController:
             "default_output": "output.json",
             "max_script_count": 10
         }
+        # 已加载的脚本类，按脚本绝对路径缓存(修改时间, 脚本类)，文件未修改时不重新执行模块
+        self._class_cache: Dict[str, tuple] = {}
     
     def register_script(self, name: str, script_path: str) -> Dict[str, Any]:
         """
@@ -136,41 +86,40 @@ class ScriptController:
                     "message": f"脚本已注册: {name}"
                 }
             
-            # 动态导入脚本
-            spec = importlib.util.spec_from_file_location(name, script_path)
-            if spec is None:
-                return {
-                    "status": "error",
-                    "message": f"无法加载脚本: {script_path}"
-                }
-            
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            # 查找脚本类
-            script_class = None
-            
-            # 检查每个类，看它是否实现了ScriptInterface的关键方法
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                if isinstance(attr, type):
-                    # 检查是否是类，并且不是ScriptInterface本身
-                    if attr.__name__ != 'ScriptInterface':
-                        # 检查是否实现了ScriptInterface的所有关键方法
-                        has_configure = hasattr(attr, 'configure') and callable(getattr(attr, 'configure'))
-                        has_execute = hasattr(attr, 'execute') and callable(getattr(attr, 'execute'))
-                        has_get_info = hasattr(attr, 'get_info') and callable(getattr(attr, 'get_info'))
-                        
-                        if has_configure and has_execute and has_get_info:
-                            # 找到一个实现了ScriptInterface关键方法的类
-                            script_class = attr
-                            break
-            
-            if script_class is None:
-                return {
-                    "status": "error",
-                    "message": f"脚本未实现ScriptInterface接口: {script_path}"
-                }
+            # 脚本文件未修改时复用已加载的脚本类
+            cache_key = os.path.abspath(script_path)
+            mtime = os.path.getmtime(script_path)
+            cached = self._class_cache.get(cache_key)
+            if cached is not None and cached[0] == mtime:
+                script_class = cached[1]
+            else:
+                # 动态导入脚本，模块以独立名称登记到sys.modules，
+                # 脚本中的类和函数才能被pickle，供多进程分析等场景使用
+                module_name = f"_script_{name}"
+                spec = importlib.util.spec_from_file_location(module_name, script_path)
+                if spec is None:
+                    return {
+                        "status": "error",
+                        "message": f"无法加载脚本: {script_path}"
+                    }
+                
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = module
+                try:
+                    spec.loader.exec_module(module)
+                except BaseException:
+                    sys.modules.pop(module_name, None)
+                    raise
+                
+                # 查找脚本类
+                script_class = self._find_script_class(module)
+                if script_class is None:
+                    return {
+                        "status": "error",
+                        "message": f"脚本未实现ScriptInterface接口: {script_path}"
+                    }
+                
+                self._class_cache[cache_key] = (mtime, script_class)
             
             # 创建脚本实例
             script_instance = script_class()
@@ -196,6 +145,24 @@ class ScriptController:
                 "message": f"脚本注册失败: {str(e)}"
             }
     
+    def _find_script_class(self, module) -> Optional[type]:
+        """
+        查找模块中的脚本类
+        
+        Args:
+            module: 已导入的脚本模块
+        
+        Returns:
+            Optional[type]: 脚本类，未找到时返回None
+        """
+        # 优先使用模块显式声明的脚本类
+        script_class = getattr(module, '__script_class__', None)
+        if isinstance(script_class, type):
+            return script_class
+        
+        # ScriptInterface的子类在模块执行时已按模块名登记
+        return ScriptInterface.get_registered_class(module.__name__)
+    
     def unregister_script(self, name: str) -> Dict[str, Any]:
         """
         卸载脚本
@@ -289,6 +256,43 @@ class ScriptController:
                 "message": f"脚本执行失败: {str(e)}"
             }
     
+    def process_data(self, name: str, data: Any) -> Dict[str, Any]:
+        """
+        使用指定脚本在内存中处理数据
+        
+        Args:
+            name: 脚本名称
+            data: 输入数据
+        
+        Returns:
+            Dict: 执行结果
+        """
+        try:
+            if name not in self.scripts:
+                return {
+                    "status": "error",
+                    "message": f"脚本未注册: {name}"
+                }
+            
+            script_instance = self.scripts[name]["instance"]
+            if not hasattr(script_instance, "process"):
+                return {
+                    "status": "error",
+                    "message": f"脚本不支持内存数据处理: {name}"
+                }
+            
+            logger.info(f"开始处理内存数据: {name}")
+            result = script_instance.process(data)
+            
+            logger.info(f"内存数据处理完成: {name}，结果: {result.get('status')}")
+            return result
+        except Exception as e:
+            logger.error(f"脚本执行失败: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"脚本执行失败: {str(e)}"
+            }
+    
     def configure(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """
         配置控制器
@@ -322,6 +326,15 @@ def main():
     """
     主函数
     """
+    # 直接运行时配置日志，作为应用模块导入时由应用入口统一配置
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - [%(name)s] %(message)s',
+        handlers=[
+            logging.StreamHandler()
+        ]
+    )
+    
     controller = ScriptController()
     
     # 解析命令行参数
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+脚本接口定义
+
+功能：
+1. 定义所有脚本共用的ScriptInterface接口
+2. 登记接口的实现类，脚本控制器注册脚本时无需扫描模块属性
+"""
+
+from typing import Dict, Any, List, Optional
+
+
+class ScriptInterface:
+    """
+    脚本接口基类，定义标准化接口
+    
+    子类在定义时按所在模块名登记到注册表，脚本控制器导入脚本后直接从注册表取得脚本类
+    """
+    
+    # 模块名 -> 该模块中最后定义的ScriptInterface子类
+    _registry: Dict[str, type] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        ScriptInterface._registry[cls.__module__] = cls
+    
+    @classmethod
+    def get_registered_class(cls, module_name: str) -> Optional[type]:
+        """
+        获取模块中登记的脚本类
+        
+        Args:
+            module_name: 模块名
+        
+        Returns:
+            Optional[type]: 脚本类，模块中没有ScriptInterface子类时返回None
+        """
+        return ScriptInterface._registry.get(module_name)
+    
+    def __init__(self):
+        self.name = ""
+        self.description = ""
+        self.version = "1.0.0"
+        self.author = ""
+    
+    def configure(self, config: Dict[str, Any]) -> bool:
+        """
+        配置脚本
+        
+        Args:
+            config: 配置参数
+        
+        Returns:
+            bool: 配置是否成功
+        """
+        return True
+    
+    def execute(self, args: List[str]) -> Dict[str, Any]:
+        """
+        执行脚本
+        
+        Args:
+            args: 命令行参数
+        
+        Returns:
+            Dict: 执行结果，包含status和data字段
+        """
+        return {"status": "success", "data": {}}
+    
+    def process(self, data: Any) -> Dict[str, Any]:
+        """
+        在内存中处理数据，不读写文件
+        
+        Args:
+            data: 输入数据
+        
+        Returns:
+            Dict: 执行结果，包含status和data字段
+        """
+        return {"status": "error", "message": f"脚本不支持内存数据处理: {self.name}"}
+    
+    def get_info(self) -> Dict[str, Any]:
+        """
+        获取脚本信息
+        
+        Returns:
+            Dict: 脚本信息
+        """
+        return {
+            "name": self.name,
+            "description": self.description,
+            "version": self.version,
+            "author": self.author
+        }
@@ -3,10 +3,13 @@
 """
 
 import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
 from app.models.bookmark import Bookmark
 
 class Classifier:
-    def __init__(self):
+    def __init__(self, cache_size=100000):
         # 定义关键词分类规则
         self.category_keywords = {
             '技术': ['python', 'javascript', 'java', '编程', '开发', 'github', 'git', 'linux', 'docker'],
@@ -24,6 +27,51 @@ class Classifier:
             '文档': ['文档', 'doc', 'document', '手册']
         }
         
+        # 按(url, title)缓存打标和分类结果(LRU)，重复导入的书签无需重新计算，单个和批量处理共用
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        
+    def process_bookmark(self, bookmark):
+        """为书签打标签并分类，相同URL和标题的书签复用缓存结果"""
+        key = (bookmark.url, bookmark.title)
+        result = self._cache_get(key)
+        if result is None:
+            result = self._analyze(bookmark.url, bookmark.title)
+            self._cache_put(key, result)
+        self._apply_result(bookmark, result)
+        return bookmark
+        
+    def _cache_get(self, key):
+        """读取缓存的(标签元组, 分类)，未命中时返回None"""
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+            return result
+        
+    def _cache_put(self, key, result):
+        """写入缓存，超过容量时淘汰最久未使用的结果"""
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        
+    def _apply_result(self, bookmark, result):
+        """将(标签元组, 分类)写入书签，没有匹配分类时保留原分类"""
+        tags, category = result
+        bookmark.tags = list(tags)
+        if category is not None:
+            bookmark.category = category
+        
+    def _analyze(self, url, title):
+        """计算书签的标签和分类，返回(标签元组, 分类)"""
+        bookmark = Bookmark(url=url, title=title)
+        self.tag_bookmark(bookmark)
+        self.classify_bookmark(bookmark)
+        return tuple(bookmark.tags), bookmark.category
+        
     def classify_bookmark(self, bookmark):
         """对书签进行分类"""
         # 合并标题和URL进行分析
@@ -55,13 +103,86 @@ class Classifier:
                 tags.append(tag)
                 
         # 提取URL中的域名作为标签
-        domain_match = re.search(r'https?://(?:www\.)?([^/]+)', bookmark.url)
-        if domain_match:
-            domain = domain_match.group(1).replace('www.', '')
-            # 移除常见的顶级域名
-            domain = re.sub(r'\.(com|org|net|edu|gov|cn|io)$', '', domain)
-            if domain and domain not in tags:
-                tags.append(domain)
+        domain = self._domain_tag(bookmark.url)
+        if domain and domain not in tags:
+            tags.append(domain)
                 
         bookmark.tags = tags
-        return bookmark
\ No newline at end of file
+        return bookmark
+        
+    def process_bookmarks(self, bookmarks):
+        """批量为书签打标签并分类，命中缓存的书签直接复用结果，其余书签的关键词只在合并后的文本上扫描一次"""
+        misses = []
+        for bookmark in bookmarks:
+            result = self._cache_get((bookmark.url, bookmark.title))
+            if result is None:
+                misses.append(bookmark)
+            else:
+                self._apply_result(bookmark, result)
+                
+        hits = self._match_keywords(misses)
+        for bookmark, matched in zip(misses, hits):
+            result = (tuple(self._tags_from_hits(bookmark.url, matched)),
+                      self._category_from_hits(matched))
+            self._cache_put((bookmark.url, bookmark.title), result)
+            self._apply_result(bookmark, result)
+            
+        return bookmarks
+        
+    def _category_from_hits(self, matched):
+        """根据书签命中的关键词计算分类，没有匹配时返回None"""
+        if not matched:
+            return None
+        scores = {category: len(matched.intersection(keywords))
+                  for category, keywords in self.category_keywords.items()}
+        best_category = max(scores, key=scores.get)
+        if scores[best_category] > 0:
+            return best_category
+        return None
+        
+    def _tags_from_hits(self, url, matched):
+        """根据书签命中的关键词和URL域名计算标签列表"""
+        tags = [tag for tag, keywords in self.tag_keywords.items()
+                if not matched.isdisjoint(keywords)]
+        domain = self._domain_tag(url)
+        if domain and domain not in tags:
+            tags.append(domain)
+        return tags
+        
+    def _match_keywords(self, bookmarks):
+        """
+        在所有书签文本拼接成的语料上逐个查找关键词
+        
+        返回与书签一一对应的集合列表，每个集合包含该书签文本中出现的关键词
+        """
+        texts = [(b.title + b.url).lower() for b in bookmarks]
+        hits = [set() for _ in texts]
+        if not texts:
+            return hits
+            
+        # 用\x00分隔各书签文本，关键词不会跨越两个书签匹配
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        corpus = '\x00'.join(texts)
+        
+        keywords = set()
+        for group in (self.category_keywords, self.tag_keywords):
+            for words in group.values():
+                keywords.update(words)
+                
+        for keyword in keywords:
+            for match in re.finditer(re.escape(keyword), corpus):
+                hits[bisect_right(starts, match.start()) - 1].add(keyword)
+                
+        return hits
+        
+    def _domain_tag(self, url):
+        """提取URL中的域名作为标签，移除www.和常见顶级域名"""
+        domain_match = re.search(r'https?://(?:www\.)?([^/]+)', url)
+        if not domain_match:
+            return ''
+        domain = domain_match.group(1).replace('www.', '')
+        return re.sub(r'\.(com|org|net|edu|gov|cn|io)$', '', domain)
\ No newline at end of file
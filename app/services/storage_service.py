@@ -2,43 +2,316 @@
 数据存储接口
 """
 
-import json
+import atexit
+import gzip
+import logging
+import os
+import threading
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from app.models.bookmark import Bookmark
 
+logger = logging.getLogger('storage')
+
+# 文件读写缓冲区大小
+IO_BUFFER_SIZE = 64 * 1024
+
+# 删除记录（墓碑）的键名
+TOMBSTONE_KEY = '_del'
+
+def bookmark_to_record(bookmark):
+    """将书签转换为可序列化的记录"""
+    return {
+        'url': bookmark.url,
+        'title': bookmark.title,
+        'tags': bookmark.tags,
+        'category': bookmark.category
+    }
+
+def _to_bookmarks(records):
+    """将日志记录转换为书签列表，加载和各迁移路径共用"""
+    return [
+        Bookmark(
+            url=item['url'],
+            title=item['title'],
+            tags=item['tags'],
+            category=item['category']
+        )
+        for item in records
+    ]
+
 class Storage:
-    def __init__(self, file_path):
+    """
+    基于JSONL追加日志的书签存储
+    
+    每行一条记录：新增和更新追加完整书签记录，删除追加 {"_del": url} 墓碑记录，
+    加载时按URL重放日志。日志中的失效记录过多时重写文件进行压缩。
+    
+    文件名以 .gz 结尾时使用gzip压缩存储，每次追加写入一个新的gzip成员，
+    读取时按顺序解压全部成员。
+    """
+    
+    def __init__(self, file_path, legacy_path=None, compact_ratio=2.0, min_compact_records=1000,
+                 compress_level=6):
         self.file_path = file_path
+        self.legacy_path = legacy_path  # 旧版JSON数组格式的数据文件，用于迁移
+        self.compact_ratio = compact_ratio  # 日志记录数超过有效书签数的倍数时压缩
+        self.min_compact_records = min_compact_records  # 日志记录数低于此值时不压缩
+        self.compressed = file_path.endswith('.gz')
+        self.compress_level = compress_level  # gzip压缩级别
+        self._record_count = 0
+        self._live_urls = set()
         
     def save_bookmarks(self, bookmarks):
-        """保存书签到文件"""
-        data = []
-        for bookmark in bookmarks:
-            data.append({
-                'url': bookmark.url,
-                'title': bookmark.title,
-                'tags': bookmark.tags,
-                'category': bookmark.category
-            })
-            
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        """将全部书签重写到文件（压缩日志）"""
+        tmp_path = self.file_path + '.tmp'
+        with self._open(tmp_path, 'wb') as f:
+            for bookmark in bookmarks:
+                f.write(orjson.dumps(bookmark) + b'\n')
+        os.replace(tmp_path, self.file_path)
+        
+        self._live_urls = {bookmark.url for bookmark in bookmarks}
+        self._record_count = len(self._live_urls)
+        
+    def append_bookmark(self, bookmark):
+        """追加一条新增或更新记录"""
+        self.append_records([bookmark_to_record(bookmark)])
+        
+    def delete_bookmark(self, url):
+        """追加一条删除记录"""
+        self.append_records([{TOMBSTONE_KEY: url}])
+        
+    def append_records(self, records):
+        """批量追加日志记录"""
+        try:
+            size = os.path.getsize(self.file_path)
+        except FileNotFoundError:
+            size = 0
+            
+        try:
+            with self._open(self.file_path, 'ab') as f:
+                for record in records:
+                    f.write(orjson.dumps(record) + b'\n')
+        except Exception:
+            # 写入失败时截掉写了一半的记录，重试追加的记录不会与残缺行连在一起
+            try:
+                os.truncate(self.file_path, size)
+            except OSError:
+                pass
+            raise
             
+        for record in records:
+            if TOMBSTONE_KEY in record:
+                self._live_urls.discard(record[TOMBSTONE_KEY])
+            else:
+                self._live_urls.add(record['url'])
+        self._record_count += len(records)
+        
+    def needs_compaction(self):
+        """判断日志中的失效记录是否过多"""
+        return (self._record_count >= self.min_compact_records and
+                self._record_count > len(self._live_urls) * self.compact_ratio)
+                
+    def compact(self):
+        """按当前文件内容重写日志，只保留有效书签"""
+        self.save_bookmarks(self.load_bookmarks())
+        
     def load_bookmarks(self):
         """从文件加载书签"""
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            bookmarks = []
-            for item in data:
-                bookmark = Bookmark(
-                    url=item['url'],
-                    title=item['title'],
-                    tags=item['tags'],
-                    category=item['category']
-                )
-                bookmarks.append(bookmark)
+            records, record_count, torn = self._replay(self.file_path, self.compressed)
+        except FileNotFoundError:
+            return self._migrate_uncompressed()
+            
+        bookmarks = _to_bookmarks(records.values())
+        self._live_urls = set(records)
+        self._record_count = record_count
+        
+        # 末尾有残缺记录时重写文件，之后追加的记录不会接在残缺内容后面
+        if torn:
+            self.save_bookmarks(bookmarks)
+        return bookmarks
+        
+    def _open(self, path, mode):
+        """打开日志文件，压缩存储时使用gzip"""
+        if self.compressed:
+            return gzip.open(path, mode, compresslevel=self.compress_level)
+        return open(path, mode, buffering=IO_BUFFER_SIZE)
+        
+    def _replay(self, path, compressed):
+        """
+        重放日志文件，返回(以URL为键的有效记录, 日志记录数, 末尾是否有残缺记录)
+        
+        进程在追加时退出会在文件末尾留下写了一半的记录（或不完整的gzip成员），
+        这种末尾残缺记录会被跳过；残缺记录之后还有内容时说明文件已损坏，抛出ValueError
+        """
+        records = {}
+        record_count = 0
+        torn = False
+        opener = gzip.open if compressed else open
+        with opener(path, 'rb') as f:
+            try:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    if torn:
+                        raise ValueError(f"书签日志文件已损坏: {path}")
+                    try:
+                        item = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        torn = True
+                        continue
+                    record_count += 1
+                    if TOMBSTONE_KEY in item:
+                        records.pop(item[TOMBSTONE_KEY], None)
+                    else:
+                        records[item['url']] = item
+            except EOFError:
+                # gzip成员不完整
+                torn = True
                 
-            return bookmarks
+        if torn:
+            logger.warning(f"跳过书签日志文件末尾的残缺记录: {path}")
+        return records, record_count, torn
+        
+    def _migrate_uncompressed(self):
+        """压缩存储的文件不存在时，从同名的未压缩日志加载书签并转换为压缩格式"""
+        if not self.compressed:
+            return self._migrate_legacy()
+            
+        try:
+            records, _, _ = self._replay(self.file_path[:-len('.gz')], False)
         except FileNotFoundError:
-            return []
\ No newline at end of file
+            return self._migrate_legacy()
+            
+        bookmarks = _to_bookmarks(records.values())
+        self.save_bookmarks(bookmarks)
+        return bookmarks
+        
+    def _migrate_legacy(self):
+        """从旧版JSON数组文件加载书签，并转换为日志格式"""
+        if not self.legacy_path:
+            return []
+            
+        try:
+            with open(self.legacy_path, 'rb', buffering=IO_BUFFER_SIZE) as f:
+                data = orjson.loads(f.read())
+        except FileNotFoundError:
+            return []
+            
+        # 旧版文件可能包含重复URL，与日志重放一致只保留最后一条
+        records = {item['url']: item for item in data}
+        
+        bookmarks = _to_bookmarks(records.values())
+        self.save_bookmarks(bookmarks)
+        return bookmarks
+
+class BufferedStorage:
+    """延迟写入的存储包装器，合并短时间内的多次写入请求"""
+    
+    def __init__(self, storage, flush_interval=1.0, max_pending=100):
+        self.storage = storage
+        self.flush_interval = flush_interval  # 最长延迟写入时间（秒）
+        self.max_pending = max_pending  # 累计多少次修改后立即写入
+        self._bookmarks = None
+        self._records = []
+        self._pending = 0
+        self._timer = None
+        self._flush_submitted = False
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # 达到累计修改上限时在后台线程写入，请求线程不等待磁盘
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        
+        # 进程退出前写入尚未保存的修改
+        atexit.register(self.flush)
+        
+    def save_bookmarks(self, bookmarks):
+        """标记全部书签待重写，由后台定时写入文件"""
+        with self._lock:
+            self._bookmarks = bookmarks
+            self._records = []
+        self._schedule()
+        
+    def append_bookmark(self, bookmark):
+        """记录一条新增或更新，由后台定时追加到文件"""
+        record = bookmark_to_record(bookmark)
+        with self._lock:
+            self._records.append(record)
+        self._schedule()
+        
+    def delete_bookmark(self, url):
+        """记录一条删除，由后台定时追加到文件"""
+        with self._lock:
+            self._records.append({TOMBSTONE_KEY: url})
+        self._schedule()
+        
+    def _schedule(self):
+        """累计一次修改，必要时启动定时器或提交后台写入"""
+        with self._lock:
+            self._pending += 1
+            flush_now = self._pending >= self.max_pending and not self._flush_submitted
+            if flush_now:
+                self._flush_submitted = True
+            elif self._timer is None:
+                self._start_timer()
+                
+        if flush_now:
+            self._executor.submit(self._flush_in_background)
+            
+    def _start_timer(self):
+        """启动延迟写入定时器，调用方需持有self._lock"""
+        self._timer = threading.Timer(self.flush_interval, self._flush_in_background)
+        self._timer.daemon = True
+        self._timer.start()
+        
+    def _flush_in_background(self):
+        """定时器和后台线程中写入，失败时已在flush中记录日志并保留修改等待重试"""
+        try:
+            self.flush()
+        except Exception:
+            pass
+            
+    def flush(self):
+        """立即写入尚未保存的修改"""
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                bookmarks = self._bookmarks
+                records = self._records
+                self._bookmarks = None
+                self._records = []
+                self._pending = 0
+                self._flush_submitted = False
+                
+            try:
+                if bookmarks is not None:
+                    self.storage.save_bookmarks(list(bookmarks))
+                    bookmarks = None
+                if records:
+                    self.storage.append_records(records)
+                    records = []
+                if self.storage.needs_compaction():
+                    self.storage.compact()
+            except Exception as e:
+                logger.error(f"写入书签文件失败，修改将在稍后重试: {e}")
+                self._restore_pending(bookmarks, records)
+                raise
+                
+    def _restore_pending(self, bookmarks, records):
+        """写入失败时放回尚未保存的修改，并启动定时器重试"""
+        with self._lock:
+            # 写入期间又有全部书签待重写时，新的快照已包含这些修改
+            if self._bookmarks is None:
+                if bookmarks is not None:
+                    self._bookmarks = bookmarks
+                self._records = records + self._records
+            self._pending += 1
+            if self._timer is None:
+                self._start_timer()
+                
+    def load_bookmarks(self):
+        """从文件加载书签"""
+        return self.storage.load_bookmarks()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志配置工具
+
+功能：
+1. 在应用入口统一配置日志格式和级别
+2. 各模块只通过logging.getLogger获取日志记录器，导入时不修改全局日志配置
+"""
+
+import logging
+
+# 日志格式，[%(name)s] 输出各模块的日志记录器名称
+LOG_FORMAT = '%(asctime)s - %(levelname)s - [%(name)s] %(message)s'
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    配置应用日志，只需在应用入口调用一次
+    
+    Args:
+        level: 日志级别
+    """
+    logging.basicConfig(
+        level=level,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.StreamHandler()
+        ]
+    )
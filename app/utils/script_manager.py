@@ -12,17 +12,10 @@
 
 import os
 import logging
+from functools import lru_cache
 from app.scripts.controller import ScriptController
 from typing import Dict, Any, List
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - [script_manager] %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger('script_manager')
 
 
@@ -62,6 +55,9 @@ class ScriptManager:
         """
         运行指定脚本
         
+        脚本模块在注册时导入一次并常驻内存，调用时在当前进程内直接执行，
+        不会为每次请求启动新的解释器进程
+        
         Args:
             script_name: 脚本名称
             args: 脚本参数
@@ -71,6 +67,19 @@ class ScriptManager:
         """
         return self.controller.run_script(script_name, args)
     
+    def process_data(self, script_name: str, data: Any) -> Dict[str, Any]:
+        """
+        使用指定脚本在内存中处理数据，不读写中间文件
+        
+        Args:
+            script_name: 脚本名称
+            data: 输入数据
+            
+        Returns:
+            脚本执行结果
+        """
+        return self.controller.process_data(script_name, data)
+    
     def list_scripts(self) -> Dict[str, Any]:
         """
         列出所有已注册的脚本
@@ -118,5 +127,12 @@ class ScriptManager:
         return self.controller.configure(config)
 
 
-# 全局脚本管理器实例
-script_manager = ScriptManager()
+@lru_cache(maxsize=1)
+def get_script_manager() -> ScriptManager:
+    """
+    获取全局脚本管理器实例，首次调用时才创建并注册默认脚本，导入本模块时不会加载脚本
+    
+    Returns:
+        脚本管理器实例
+    """
+    return ScriptManager()
@@ -15,6 +15,11 @@ import os
 # 将项目根目录添加到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from app.utils.logging_utils import configure_logging
+
+# 在导入应用之前配置日志，脚本注册等导入期日志也能输出
+configure_logging()
+
 from app.api.api_app import app
 
 if __name__ == '__main__':
@@ -0,0 +1,100 @@
+"""
+书签分析器测试
+"""
+
+import multiprocessing
+
+import pytest
+
+from app.scripts import bookmark_analyzer
+from app.scripts.bookmark_analyzer import BookmarkAnalyzer
+
+
+BOOKMARKS = [
+    {'title': 'GitHub - 开源项目仓库', 'url': 'https://github.com/example/repo'},
+    {'title': 'React 前端开发教程', 'url': 'https://react.dev/learn'},
+    {'title': '阿里云服务器', 'url': 'https://www.aliyun.com/product/ecs'},
+    {'title': '随便看看', 'url': 'https://example.com'},
+] * 10
+
+
+def serial_results(bookmarks, config=None):
+    analyzer = BookmarkAnalyzer()
+    if config:
+        analyzer.configure(config)
+    return list(analyzer.iter_analysis(bookmarks, include_date=False))
+
+
+@pytest.fixture
+def no_pool(monkeypatch):
+    """创建进程池时测试失败"""
+    def fail(*args, **kwargs):
+        raise AssertionError('不应创建进程池')
+    monkeypatch.setattr(bookmark_analyzer, 'ProcessPoolExecutor', fail)
+
+
+def test_process_never_uses_process_pool(no_pool):
+    analyzer = BookmarkAnalyzer()
+    analyzer.configure({'parallel_threshold': 1})
+
+    result = analyzer.process(BOOKMARKS)
+
+    assert result['status'] == 'success'
+    suggestions = result['data']['suggestions']
+    for suggestion in suggestions:
+        del suggestion['analysis_date']
+    assert suggestions == serial_results(BOOKMARKS)
+
+
+def test_parallel_below_threshold_runs_serially(no_pool):
+    analyzer = BookmarkAnalyzer()
+
+    results = list(analyzer.iter_analysis(BOOKMARKS, include_date=False, parallel=True))
+
+    assert results == serial_results(BOOKMARKS)
+
+
+def test_parallel_without_fork_runs_serially(no_pool, monkeypatch):
+    monkeypatch.setattr(multiprocessing, 'get_all_start_methods', lambda: ['spawn'])
+    analyzer = BookmarkAnalyzer()
+    analyzer.configure({'parallel_threshold': 1})
+
+    results = list(analyzer.iter_analysis(BOOKMARKS, include_date=False, parallel=True))
+
+    assert results == serial_results(BOOKMARKS)
+
+
+def test_pool_failure_falls_back_to_serial(monkeypatch, caplog):
+    def broken_pool(*args, **kwargs):
+        raise OSError('无法创建子进程')
+    monkeypatch.setattr(bookmark_analyzer, 'ProcessPoolExecutor', broken_pool)
+    monkeypatch.setattr(multiprocessing, 'get_all_start_methods', lambda: ['fork', 'spawn'])
+    analyzer = BookmarkAnalyzer()
+    analyzer.configure({'parallel_threshold': 1})
+
+    results = list(analyzer.iter_analysis(BOOKMARKS, include_date=False, parallel=True))
+
+    assert results == serial_results(BOOKMARKS)
+    assert '改为单进程分析' in caplog.text
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='需要fork启动方式')
+def test_parallel_matches_serial():
+    config = {'use_ai_classification': False, 'parallel_threshold': 1, 'max_workers': 2}
+    analyzer = BookmarkAnalyzer()
+    analyzer.configure(config)
+
+    results = list(analyzer.iter_analysis(BOOKMARKS, include_date=False, parallel=True))
+
+    assert results == serial_results(BOOKMARKS, config)
+
+
+@pytest.mark.parametrize('max_suggestions', [1, 2, 3])
+def test_max_suggestions_limits_suggestions(max_suggestions):
+    analyzer = BookmarkAnalyzer()
+    analyzer.configure({'max_suggestions': max_suggestions, 'use_ai_classification': False})
+
+    for result in analyzer.iter_analysis(BOOKMARKS[:4], include_date=False):
+        assert 1 <= len(result['alias_suggestions']) <= max_suggestions
+        assert 1 <= len(result['category_suggestions']) <= max_suggestions
+        assert 1 <= len(result['group_suggestions']) <= max_suggestions
@@ -0,0 +1,59 @@
+"""
+自动打标和分类测试
+"""
+
+from app.models.bookmark import Bookmark
+from app.services.classifier_service import Classifier
+
+
+SAMPLES = [
+    ('https://github.com/python/cpython', 'CPython 源码'),
+    ('https://www.python.org/doc/', 'Python 文档'),
+    ('https://docs.docker.com/guide', 'Docker Guide 教程'),
+    ('https://news.example.cn/finance', '财经新闻 时事'),
+    ('https://movie.example.com', '电影 音乐 游戏'),
+    ('https://www.example.org/howto', 'Java and JavaScript code howto'),
+    ('https://travel.example.net', '旅行 美食 生活'),
+    ('https://example.edu/course', '学术课程'),
+    ('https://example.io', ''),
+    ('not a url', '无关内容'),
+    # 关键词跨越两个书签文本时不应匹配
+    ('https://a.example.com/py', ''),
+    ('thon', ''),
+    ('https://b.example.com/gi', ''),
+    ('t', ''),
+]
+
+
+def single(classifier, url, title, category=None):
+    bookmark = Bookmark(url=url, title=title, category=category)
+    classifier.tag_bookmark(bookmark)
+    classifier.classify_bookmark(bookmark)
+    return bookmark.tags, bookmark.category
+
+
+def test_batch_matches_single_bookmark_path():
+    bookmarks = [Bookmark(url=url, title=title, category='原分类') for url, title in SAMPLES]
+
+    Classifier().process_bookmarks(bookmarks)
+
+    reference = Classifier()
+    for bookmark, (url, title) in zip(bookmarks, SAMPLES):
+        assert (bookmark.tags, bookmark.category) == single(reference, url, title, '原分类')
+
+
+def test_batch_and_single_share_cache():
+    classifier = Classifier(cache_size=4)
+    bookmarks = [Bookmark(url=url, title=title) for url, title in SAMPLES]
+    classifier.process_bookmarks(bookmarks)
+
+    assert len(classifier._cache) == 4
+
+    # 命中缓存的结果与重新计算的结果一致
+    url, title = SAMPLES[-1]
+    bookmark = classifier.process_bookmark(Bookmark(url=url, title=title))
+    assert (bookmark.tags, bookmark.category) == single(Classifier(), url, title)
+
+    again = [Bookmark(url=url, title=title) for url, title in SAMPLES]
+    classifier.process_bookmarks(again)
+    assert [(b.tags, b.category) for b in again] == [(b.tags, b.category) for b in bookmarks]
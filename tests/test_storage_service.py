@@ -0,0 +1,185 @@
+"""
+书签存储测试
+"""
+
+import gzip
+
+import orjson
+import pytest
+
+from app.models.bookmark import Bookmark
+from app.services.storage_service import BufferedStorage, Storage
+
+
+def make_bookmark(url, title='标题', tags=None, category=None):
+    return Bookmark(url=url, title=title, tags=tags or [], category=category)
+
+
+@pytest.fixture(params=['bookmarks.jsonl', 'bookmarks.jsonl.gz'])
+def storage(request, tmp_path):
+    return Storage(str(tmp_path / request.param))
+
+
+def test_replay_keeps_last_record_per_url(storage):
+    storage.append_bookmark(make_bookmark('https://a.com', title='旧标题'))
+    storage.append_bookmark(make_bookmark('https://b.com'))
+    storage.append_bookmark(make_bookmark('https://a.com', title='新标题', tags=['x']))
+
+    bookmarks = Storage(storage.file_path).load_bookmarks()
+
+    assert [b.url for b in bookmarks] == ['https://a.com', 'https://b.com']
+    assert bookmarks[0].title == '新标题'
+    assert bookmarks[0].tags == ['x']
+
+
+def test_tombstone_removes_bookmark(storage):
+    storage.append_bookmark(make_bookmark('https://a.com'))
+    storage.append_bookmark(make_bookmark('https://b.com'))
+    storage.delete_bookmark('https://a.com')
+
+    reloaded = Storage(storage.file_path)
+    assert [b.url for b in reloaded.load_bookmarks()] == ['https://b.com']
+    assert reloaded._record_count == 3
+
+    # 删除后重新添加
+    storage.append_bookmark(make_bookmark('https://a.com'))
+    assert [b.url for b in Storage(storage.file_path).load_bookmarks()] == ['https://b.com', 'https://a.com']
+
+
+def test_compaction_drops_stale_records(tmp_path):
+    storage = Storage(str(tmp_path / 'bookmarks.jsonl'), compact_ratio=2.0, min_compact_records=4)
+    storage.append_bookmark(make_bookmark('https://a.com'))
+    storage.append_bookmark(make_bookmark('https://b.com'))
+    assert not storage.needs_compaction()
+
+    for i in range(3):
+        storage.append_bookmark(make_bookmark('https://a.com', title=f'标题{i}'))
+    storage.delete_bookmark('https://b.com')
+    assert storage.needs_compaction()
+
+    storage.compact()
+
+    assert not storage.needs_compaction()
+    with open(storage.file_path, 'rb') as f:
+        lines = f.read().splitlines()
+    assert [orjson.loads(line)['title'] for line in lines] == ['标题2']
+
+
+def test_migrate_legacy_json_array(tmp_path):
+    legacy_path = tmp_path / 'bookmarks.json'
+    legacy_path.write_bytes(orjson.dumps([
+        {'url': 'https://a.com', 'title': '旧', 'tags': [], 'category': None},
+        {'url': 'https://b.com', 'title': 'B', 'tags': ['t'], 'category': '技术'},
+        {'url': 'https://a.com', 'title': '新', 'tags': [], 'category': None},
+    ]))
+    storage = Storage(str(tmp_path / 'bookmarks.jsonl'), legacy_path=str(legacy_path))
+
+    bookmarks = storage.load_bookmarks()
+
+    assert [(b.url, b.title) for b in bookmarks] == [('https://a.com', '新'), ('https://b.com', 'B')]
+    # 迁移后写入日志文件，再次加载不依赖旧版文件
+    legacy_path.unlink()
+    assert [b.url for b in Storage(storage.file_path).load_bookmarks()] == ['https://a.com', 'https://b.com']
+
+
+def test_migrate_uncompressed_log(tmp_path):
+    plain = Storage(str(tmp_path / 'bookmarks.jsonl'))
+    plain.append_bookmark(make_bookmark('https://a.com'))
+    plain.delete_bookmark('https://a.com')
+    plain.append_bookmark(make_bookmark('https://b.com'))
+
+    compressed = Storage(str(tmp_path / 'bookmarks.jsonl.gz'))
+
+    assert [b.url for b in compressed.load_bookmarks()] == ['https://b.com']
+    assert (tmp_path / 'bookmarks.jsonl.gz').exists()
+
+
+def test_missing_file_without_legacy_is_empty(storage):
+    assert storage.load_bookmarks() == []
+
+
+def test_torn_tail_is_skipped_and_rewritten(tmp_path, caplog):
+    path = tmp_path / 'bookmarks.jsonl'
+    storage = Storage(str(path))
+    storage.append_bookmark(make_bookmark('https://a.com'))
+    storage.append_bookmark(make_bookmark('https://b.com'))
+    with open(path, 'ab') as f:
+        f.write(b'{"url": "https://c.com", "tit')
+
+    reloaded = Storage(str(path))
+    bookmarks = reloaded.load_bookmarks()
+
+    assert [b.url for b in bookmarks] == ['https://a.com', 'https://b.com']
+    assert '残缺记录' in caplog.text
+
+    # 重写后追加的记录可以正常加载
+    reloaded.append_bookmark(make_bookmark('https://d.com'))
+    assert [b.url for b in Storage(str(path)).load_bookmarks()] == ['https://a.com', 'https://b.com', 'https://d.com']
+
+
+def test_truncated_gzip_member_is_skipped(tmp_path, caplog):
+    path = tmp_path / 'bookmarks.jsonl.gz'
+    storage = Storage(str(path))
+    storage.append_bookmark(make_bookmark('https://a.com'))
+    size = path.stat().st_size
+    storage.append_bookmark(make_bookmark('https://b.com'))
+    with open(path, 'r+b') as f:
+        f.truncate(size + (path.stat().st_size - size) // 2)
+
+    reloaded = Storage(str(path))
+
+    assert [b.url for b in reloaded.load_bookmarks()] == ['https://a.com']
+    assert '残缺记录' in caplog.text
+    reloaded.append_bookmark(make_bookmark('https://c.com'))
+    with gzip.open(path, 'rb') as f:
+        assert len(f.read().splitlines()) == 2
+
+
+def test_corrupt_record_before_tail_raises(tmp_path):
+    path = tmp_path / 'bookmarks.jsonl'
+    storage = Storage(str(path))
+    storage.append_bookmark(make_bookmark('https://a.com'))
+    with open(path, 'ab') as f:
+        f.write(b'not json\n')
+    storage.append_bookmark(make_bookmark('https://b.com'))
+
+    with pytest.raises(ValueError):
+        Storage(str(path)).load_bookmarks()
+
+
+class FlakyStorage(Storage):
+    """前几次追加写入失败的存储"""
+
+    def __init__(self, file_path, failures):
+        super().__init__(file_path)
+        self.failures = failures
+
+    def append_records(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise OSError('磁盘已满')
+        super().append_records(records)
+
+
+def test_buffered_storage_flushes_pending_records(tmp_path):
+    buffered = BufferedStorage(Storage(str(tmp_path / 'bookmarks.jsonl')), flush_interval=60)
+    buffered.append_bookmark(make_bookmark('https://a.com'))
+    buffered.append_bookmark(make_bookmark('https://b.com'))
+    buffered.delete_bookmark('https://a.com')
+
+    assert not (tmp_path / 'bookmarks.jsonl').exists()
+    buffered.flush()
+
+    assert [b.url for b in buffered.load_bookmarks()] == ['https://b.com']
+
+
+def test_buffered_storage_keeps_records_when_flush_fails(tmp_path):
+    buffered = BufferedStorage(FlakyStorage(str(tmp_path / 'bookmarks.jsonl'), failures=1), flush_interval=60)
+    buffered.append_bookmark(make_bookmark('https://a.com'))
+
+    with pytest.raises(OSError):
+        buffered.flush()
+    buffered.append_bookmark(make_bookmark('https://b.com'))
+    buffered.flush()
+
+    assert [b.url for b in buffered.load_bookmarks()] == ['https://a.com', 'https://b.com']